@@ -0,0 +1,131 @@
+"""Partition shipments by month, with an archive partition
+
+Revision ID: 3c8e5d1f7a24
+Revises: a91f3c6d2e57
+Create Date: 2026-10-18 22:14:36.481907
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e5d1f7a24'
+down_revision: Union[str, Sequence[str], None] = 'a91f3c6d2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same layout and names as app.shipment.archive:
+#
+#   shipments                  PARTITION BY LIST (archived)
+#     shipments_active         FOR VALUES IN (false), PARTITION BY RANGE (created_at)
+#       shipments_active_yYYYYmMM  one per month
+#       shipments_active_default   anything without a month partition yet
+#     shipments_archive        FOR VALUES IN (true)
+MONTHS_AHEAD = 3
+
+# Rebuilt on the new table in both directions
+# (index name, columns or expression, extra create_index arguments)
+INDEXES = [
+    ('ix_shipments_external_tracking_id', ['external_tracking_id'], {}),
+    ('ix_shipments_created_by_created_at_id', ['created_by', 'created_at', 'id'], {}),
+    ('ix_shipments_created_by_status', ['created_by', 'status'], {}),
+    ('ix_shipments_created_by_provider_id', ['created_by', 'provider_id'], {}),
+    ('ix_shipments_provider_id', ['provider_id'], {}),
+    ('ix_shipments_origin_trgm', ['origin'], dict(postgresql_using='gin', postgresql_ops={'origin': 'gin_trgm_ops'})),
+    ('ix_shipments_destination_trgm', ['destination'], dict(postgresql_using='gin', postgresql_ops={'destination': 'gin_trgm_ops'})),
+    # Must match app.models.shipment.shipment_search_vector
+    (
+        'ix_shipments_search_vector',
+        [sa.text("to_tsvector('simple'::regconfig, origin || ' ' || destination || ' ' || coalesce(description, ''))")],
+        dict(postgresql_using='gin'),
+    ),
+]
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def create_shipment_indexes(table: str) -> None:
+    for name, columns, options in INDEXES:
+        op.create_index(name, table, columns, unique=False, **options)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rewrites the table: run with writers stopped. Indexes are built after
+    # the copy, which is much faster than maintaining them row by row.
+    op.drop_constraint('status_history_shipment_id_fkey', 'status_history', type_='foreignkey')
+
+    op.execute("""
+        CREATE TABLE shipments_partitioned (
+            LIKE shipments INCLUDING DEFAULTS,
+            archived boolean NOT NULL DEFAULT false
+        ) PARTITION BY LIST (archived)
+    """)
+    op.execute("""
+        CREATE TABLE shipments_active PARTITION OF shipments_partitioned
+        FOR VALUES IN (false) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE shipments_archive PARTITION OF shipments_partitioned FOR VALUES IN (true)")
+    op.execute("CREATE TABLE shipments_active_default PARTITION OF shipments_active DEFAULT")
+
+    now = datetime.utcnow()
+    current = datetime(now.year, now.month, 1)
+    oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM shipments")).scalar()
+    month = datetime(oldest.year, oldest.month, 1) if oldest is not None else current
+    while month <= add_months(current, MONTHS_AHEAD):
+        end = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE shipments_active_y{month:%Y}m{month:%m} PARTITION OF shipments_active "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        month = end
+
+    op.execute("INSERT INTO shipments_partitioned SELECT *, false FROM shipments")
+    op.drop_table('shipments')
+    op.rename_table('shipments_partitioned', 'shipments')
+
+    op.create_primary_key('shipments_pkey', 'shipments', ['id', 'created_at', 'archived'])
+    op.create_foreign_key('shipments_provider_id_fkey', 'shipments', 'shipping_providers', ['provider_id'], ['id'])
+    op.create_foreign_key('shipments_created_by_fkey', 'shipments', 'users', ['created_by'], ['id'])
+    # Unique indexes on a partitioned table must contain the partition key,
+    # so shipment_id and tracking_id (random uuid4s) get plain ones, and the
+    # status_history foreign key, which needs one on shipments.id, is gone
+    op.create_index('ix_shipments_shipment_id', 'shipments', ['shipment_id'], unique=False)
+    op.create_index('ix_shipments_tracking_id', 'shipments', ['tracking_id'], unique=False)
+    create_shipment_indexes('shipments')
+    # Autovacuum never analyzes a partitioned parent itself
+    op.execute("ANALYZE shipments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE TABLE shipments_unpartitioned (LIKE shipments INCLUDING DEFAULTS)")
+    op.drop_column('shipments_unpartitioned', 'archived')
+    columns = (
+        "id, shipment_id, tracking_id, external_tracking_id, origin, destination, status, created_at, "
+        "estimated_delivery, carrier_event_at, weight_kg, dimensions, description, provider_id, created_by"
+    )
+    op.execute(f"INSERT INTO shipments_unpartitioned ({columns}) SELECT {columns} FROM shipments")
+    op.drop_table('shipments')
+    op.rename_table('shipments_unpartitioned', 'shipments')
+
+    op.create_primary_key('shipments_pkey', 'shipments', ['id'])
+    op.create_unique_constraint('shipments_shipment_id_key', 'shipments', ['shipment_id'])
+    op.create_unique_constraint('shipments_tracking_id_key', 'shipments', ['tracking_id'])
+    op.create_foreign_key('shipments_provider_id_fkey', 'shipments', 'shipping_providers', ['provider_id'], ['id'])
+    op.create_foreign_key('shipments_created_by_fkey', 'shipments', 'users', ['created_by'], ['id'])
+    create_shipment_indexes('shipments')
+
+    # History of shipments deleted while the foreign key was gone
+    op.execute("DELETE FROM status_history WHERE NOT EXISTS (SELECT 1 FROM shipments WHERE shipments.id = status_history.shipment_id)")
+    op.create_foreign_key(
+        'status_history_shipment_id_fkey', 'status_history', 'shipments',
+        ['shipment_id'], ['id'], ondelete='CASCADE',
+    )
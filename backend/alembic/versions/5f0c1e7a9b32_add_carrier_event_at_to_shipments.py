@@ -0,0 +1,28 @@
+"""Add carrier_event_at to shipments
+
+Revision ID: 5f0c1e7a9b32
+Revises: bc640452ac44
+Create Date: 2026-10-18 18:02:37.514290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0c1e7a9b32'
+down_revision: Union[str, Sequence[str], None] = 'bc640452ac44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('shipments', sa.Column('carrier_event_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('shipments', 'carrier_event_at')
@@ -0,0 +1,28 @@
+"""Add data_version to users
+
+Revision ID: 7d2e4b8c1a90
+Revises: 5f0c1e7a9b32
+Create Date: 2026-10-18 19:26:03.881472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b8c1a90'
+down_revision: Union[str, Sequence[str], None] = '5f0c1e7a9b32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,50 @@
+"""Add trigram and full-text search indexes
+
+Revision ID: 945c42623de0
+Revises: ee0982713bb3
+Create Date: 2026-10-18 13:52:30.664281
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '945c42623de0'
+down_revision: Union[str, Sequence[str], None] = 'ee0982713bb3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipments_origin_trgm', 'shipments', ['origin'],
+            postgresql_using='gin', postgresql_ops={'origin': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_shipments_destination_trgm', 'shipments', ['destination'],
+            postgresql_using='gin', postgresql_ops={'destination': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Must match app.models.shipment.shipment_search_vector
+        op.create_index(
+            'ix_shipments_search_vector', 'shipments',
+            [sa.text("to_tsvector('simple'::regconfig, origin || ' ' || destination || ' ' || coalesce(description, ''))")],
+            postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_shipments_search_vector', table_name='shipments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_shipments_destination_trgm', table_name='shipments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_shipments_origin_trgm', table_name='shipments', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,28 @@
+"""Add rows_total to jobs
+
+Revision ID: a91f3c6d2e57
+Revises: 7d2e4b8c1a90
+Create Date: 2026-10-18 20:48:19.620357
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91f3c6d2e57'
+down_revision: Union[str, Sequence[str], None] = '7d2e4b8c1a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('rows_total', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('jobs', 'rows_total')
@@ -0,0 +1,32 @@
+"""Add partial index for archiving closed shipments
+
+Revision ID: b6d1e9a4c327
+Revises: 3c8e5d1f7a24
+Create Date: 2026-10-18 23:41:07.215384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1e9a4c327'
+down_revision: Union[str, Sequence[str], None] = '3c8e5d1f7a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cascades to every partition, including month partitions created later
+    op.create_index(
+        'ix_shipments_archivable_created_at_id', 'shipments', ['created_at', 'id'], unique=False,
+        postgresql_where=sa.text("NOT archived AND status IN ('delivered', 'cancelled')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_shipments_archivable_created_at_id', table_name='shipments')
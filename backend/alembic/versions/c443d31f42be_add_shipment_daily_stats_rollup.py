@@ -0,0 +1,46 @@
+"""Add shipment_daily_stats rollup
+
+Revision ID: c443d31f42be
+Revises: e06a9766bb74
+Create Date: 2026-10-18 11:26:05.918374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c443d31f42be'
+down_revision: Union[str, Sequence[str], None] = 'e06a9766bb74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('shipment_daily_stats',
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='shipmentstatus', create_type=False), nullable=False),
+    sa.Column('provider_id', sa.UUID(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('created_by', 'day', 'status', 'provider_id')
+    )
+
+    # Backfill from existing shipments (same query as app.analytics.rollup.rebuild_daily_stats)
+    op.execute("""
+        INSERT INTO shipment_daily_stats (created_by, day, status, provider_id, count)
+        SELECT created_by, date(created_at), status,
+               coalesce(provider_id, '00000000-0000-0000-0000-000000000000'::uuid), count(*)
+        FROM shipments
+        WHERE created_by IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('shipment_daily_stats')
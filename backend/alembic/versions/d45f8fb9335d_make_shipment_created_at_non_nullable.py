@@ -0,0 +1,30 @@
+"""Make shipments.created_at non-nullable
+
+Revision ID: d45f8fb9335d
+Revises: 4081a0e1d7dc
+Create Date: 2026-10-18 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd45f8fb9335d'
+down_revision: Union[str, Sequence[str], None] = '4081a0e1d7dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (created_at, id) is the keyset used for pagination, so it can't hold NULLs
+    op.execute("UPDATE shipments SET created_at = timezone('utc', now()) WHERE created_at IS NULL")
+    op.alter_column('shipments', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('shipments', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,43 @@
+"""Add composite indexes for hot filters
+
+Revision ID: ee0982713bb3
+Revises: c443d31f42be
+Create Date: 2026-10-18 12:40:52.117630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ee0982713bb3'
+down_revision: Union[str, Sequence[str], None] = 'c443d31f42be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_shipments_created_by_created_at_id', 'shipments', ['created_by', 'created_at', 'id']),
+    ('ix_shipments_created_by_status', 'shipments', ['created_by', 'status']),
+    ('ix_shipments_created_by_provider_id', 'shipments', ['created_by', 'provider_id']),
+    ('ix_shipments_provider_id', 'shipments', ['provider_id']),
+    ('ix_shipping_providers_created_by', 'shipping_providers', ['created_by']),
+    ('ix_status_history_shipment_id_timestamp', 'status_history', ['shipment_id', 'timestamp']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so large tables stay writable; it can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -2,3 +2,6 @@ from app.models.user import User
 from app.models.shipment import Shipment, ShipmentStatus
 from app.models.shipping_provider import ShippingProvider
 from app.models.status_history import StatusHistory
+from app.models.job import Job, JobStatus
+from app.models.shipment_daily_stats import ShipmentDailyStats
+from app.models.refresh_token import RefreshToken
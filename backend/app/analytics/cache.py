@@ -0,0 +1,32 @@
+# app/analytics/cache.py
+
+"""
+In-process cache for analytics responses.
+
+Entries are keyed by user, endpoint, parameters and the user's
+users.data_version as read by conditional_get for the same request. Every
+shipment and provider write increments that column in its transaction, so
+a write makes the user's cached entries unreachable in every worker at
+once, and a body is never cached under a newer version (and so ETag) than
+the one it was computed at. Stale entries age out of the LRU.
+"""
+
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+
+analytics_cache = TTLCache(
+    max_entries=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYTICS_CACHE_TTL_SECONDS,
+)
+
+async def cached(user_id, version: int, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+    # version was read before computing, so a write that lands mid-query
+    # leaves the result under an already stale key
+    full_key = (user_id, version, key)
+    value = analytics_cache.get(full_key)
+    if value is MISSING:
+        value = await compute()
+        analytics_cache.set(full_key, value)
+    return value
@@ -0,0 +1,136 @@
+# app/analytics/rollup.py
+
+"""
+Maintenance of the shipment_daily_stats rollup.
+
+Every shipment write path reports what it changed through the helpers
+below, in the same transaction as the write itself. Rebuild from scratch
+with:
+
+    python -m app.analytics.rollup [--user <user id>]
+"""
+
+import argparse
+from collections import Counter
+from collections.abc import Mapping
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.shipment import Shipment
+from app.models.shipment_daily_stats import ShipmentDailyStats
+
+NO_PROVIDER = UUID(int=0)
+
+
+def stats_key(created_by, created_at, status, provider_id):
+    return (created_by, created_at.date(), status, provider_id or NO_PROVIDER)
+
+
+def apply_deltas(db: Session, deltas: Counter):
+    """Add the given per-key deltas to the rollup with a single upsert."""
+    values = [
+        {"created_by": created_by, "day": day, "status": status, "provider_id": provider_id, "count": delta}
+        for (created_by, day, status, provider_id), delta in deltas.items()
+        if delta
+    ]
+    if not values:
+        return
+    # Upserts lock rows in VALUES order; a fixed order keeps two writers
+    # touching the same keys (pending -> in_transit vs. the reverse) from
+    # deadlocking. Status may arrive as the enum or its plain value.
+    values.sort(key=lambda row: (
+        str(row["created_by"]), row["day"], getattr(row["status"], "value", row["status"]), str(row["provider_id"])
+    ))
+
+    stmt = pg_insert(ShipmentDailyStats).values(values)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["created_by", "day", "status", "provider_id"],
+            set_={"count": ShipmentDailyStats.count + stmt.excluded.count},
+        )
+    )
+
+
+def record_created(db: Session, rows: Iterable):
+    """Count newly inserted shipments (ORM objects or column mappings)."""
+    deltas = Counter()
+    for row in rows:
+        if not isinstance(row, Mapping):
+            row = {key: getattr(row, key) for key in ("created_by", "created_at", "status", "provider_id")}
+        deltas[stats_key(row["created_by"], row["created_at"], row["status"], row["provider_id"])] += 1
+    apply_deltas(db, deltas)
+
+
+def record_status_change(db: Session, shipment: Shipment, old_status):
+    if old_status == shipment.status:
+        return
+    deltas = Counter()
+    deltas[stats_key(shipment.created_by, shipment.created_at, old_status, shipment.provider_id)] -= 1
+    deltas[stats_key(shipment.created_by, shipment.created_at, shipment.status, shipment.provider_id)] += 1
+    apply_deltas(db, deltas)
+
+
+def record_status_changes(db: Session, rows: Iterable[Mapping]):
+    """Bulk variant of record_status_change; rows carry old_status and status."""
+    deltas = Counter()
+    for row in rows:
+        if row["old_status"] == row["status"]:
+            continue
+        deltas[stats_key(row["created_by"], row["created_at"], row["old_status"], row["provider_id"])] -= 1
+        deltas[stats_key(row["created_by"], row["created_at"], row["status"], row["provider_id"])] += 1
+    apply_deltas(db, deltas)
+
+
+def record_deleted(db: Session, shipments: Iterable[Shipment]):
+    deltas = Counter()
+    for shipment in shipments:
+        deltas[stats_key(shipment.created_by, shipment.created_at, shipment.status, shipment.provider_id)] -= 1
+    apply_deltas(db, deltas)
+
+
+def clear_user_stats(db: Session, user_id):
+    db.query(ShipmentDailyStats).filter(ShipmentDailyStats.created_by == user_id).delete()
+
+
+def rebuild_daily_stats(db: Session, user_id: Optional[UUID] = None):
+    """Recompute the rollup from the shipments table, for one user or everyone."""
+    stats = db.query(ShipmentDailyStats)
+    key_columns = (
+        Shipment.created_by,
+        func.date(Shipment.created_at),
+        Shipment.status,
+        func.coalesce(Shipment.provider_id, literal(NO_PROVIDER, ShipmentDailyStats.provider_id.type)),
+    )
+    source = select(*key_columns, func.count()).where(Shipment.created_by != None)
+
+    if user_id is not None:
+        stats = stats.filter(ShipmentDailyStats.created_by == user_id)
+        source = source.where(Shipment.created_by == user_id)
+
+    stats.delete()
+    db.execute(
+        insert(ShipmentDailyStats).from_select(
+            ["created_by", "day", "status", "provider_id", "count"],
+            source.group_by(*key_columns),
+        )
+    )
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401  (register every mapper)
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild the shipment_daily_stats rollup")
+    parser.add_argument("--user", type=UUID, help="only rebuild this user's rows")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild_daily_stats(db, args.user)
+        db.commit()
+    finally:
+        db.close()
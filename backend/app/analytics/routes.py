@@ -1,147 +1,303 @@
 # app/analytics/routes.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from datetime import datetime
-from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, extract, select
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from uuid import UUID
 
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal
 from app.models.shipment import Shipment, ShipmentStatus
 from app.models.shipping_provider import ShippingProvider
+from app.models.shipment_daily_stats import ShipmentDailyStats
 from app.models.user import User
-from app.schemas.analytics import ShipmentSummary
+from app.schemas.analytics import AnalyticsDashboard, DeliveryTimeStats, ShipmentSummary
 from app.auth.dependencies import get_current_user
+from app.analytics.cache import analytics_cache, cached
+from app.shipment.versions import conditional_get, conditional_get_scoped
 from collections import defaultdict
-from fastapi.responses import JSONResponse
 
 router = APIRouter(tags=["Analytics"])
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-@router.get("/summary", response_model=ShipmentSummary)
-def get_shipment_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    def count_by_status(status: ShipmentStatus) -> int:
-        return db.query(Shipment).filter(
-            Shipment.created_by == current_user.id,
-            Shipment.status == status
-        ).count()
+def current_year() -> int:
+    return datetime.now().year
 
-    total = db.query(Shipment).filter(Shipment.created_by == current_user.id).count()
+# Monthly trends cover the current year, so their ETags change with it
+conditional_get_this_year = conditional_get_scoped(current_year)
 
-    return ShipmentSummary(
-        total=total,
-        delivered=count_by_status(ShipmentStatus.delivered),
-        pending=count_by_status(ShipmentStatus.pending),
-        in_transit=count_by_status(ShipmentStatus.in_transit),
-        delayed=count_by_status(ShipmentStatus.delayed),
-        cancelled=count_by_status(ShipmentStatus.cancelled),
-    )
+SUMMARY_STATUSES = (
+    ShipmentStatus.delivered,
+    ShipmentStatus.pending,
+    ShipmentStatus.in_transit,
+    ShipmentStatus.delayed,
+    ShipmentStatus.cancelled,
+)
 
-@router.get("/monthly-trends", response_model=Dict[str, int])
-def monthly_shipment_trends(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    current_year = datetime.now().year
-    results = (
-        db.query(extract('month', Shipment.created_at), func.count(Shipment.id))
-        .filter(
-            Shipment.created_by == current_user.id,
-            extract('year', Shipment.created_at) == current_year
+# Whole days between creation and delivery, floored like timedelta.days
+delivery_days = func.floor(
+    extract('epoch', Shipment.estimated_delivery - Shipment.created_at) / 86400
+)
+
+
+async def query_overview(db: AsyncSession, user_id) -> Tuple[ShipmentSummary, float]:
+    """Status counts and average delivery time in a single aggregate query."""
+    total, *status_counts, avg_days = (await db.execute(
+        select(
+            func.count(Shipment.id),
+            *(func.count(Shipment.id).filter(Shipment.status == s) for s in SUMMARY_STATUSES),
+            func.avg(delivery_days).filter(
+                Shipment.status == ShipmentStatus.delivered,
+                Shipment.estimated_delivery != None
+            ),
         )
-        .group_by(extract('month', Shipment.created_at))
-        .order_by(extract('month', Shipment.created_at))
-        .all()
+        .where(Shipment.created_by == user_id)
+    )).one()
+    summary = ShipmentSummary(
+        total=total,
+        **{s.value: count for s, count in zip(SUMMARY_STATUSES, status_counts)}
     )
-    return {str(int(month)): count for month, count in results}
+    return summary, round(float(avg_days or 0), 2)
 
-@router.get("/average-delivery-time", response_model=float)
-def average_delivery_time(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    delivered_shipments = db.query(Shipment).filter(
-        Shipment.created_by == current_user.id,
-        Shipment.status == ShipmentStatus.delivered,
-        Shipment.estimated_delivery != None
-    ).all()
 
-    if not delivered_shipments:
-        return 0.0
+async def query_summary(db: AsyncSession, user_id) -> ShipmentSummary:
+    summary, _ = await query_overview(db, user_id)
+    return summary
 
-    total_days = sum(
-        (shipment.estimated_delivery - shipment.created_at).days
-        for shipment in delivered_shipments
-    )
-    return round(total_days / len(delivered_shipments), 2)
 
-@router.get("/provider-count", response_model=Dict[str, int])
-def provider_wise_shipment_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    results = (
-        db.query(ShippingProvider.name, func.count(Shipment.id))
-        .join(Shipment, Shipment.provider_id == ShippingProvider.id)
-        .filter(ShippingProvider.created_by == current_user.id)
-        .group_by(ShippingProvider.name)
-        .all()
-    )
-    return {name: count for name, count in results}
+async def query_status_trend(
+    db: AsyncSession,
+    user_id,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Dict[str, Dict[str, int]]:
+    """Daily counts per status, read from the shipment_daily_stats rollup."""
+    query = select(
+        ShipmentDailyStats.day,
+        ShipmentDailyStats.status,
+        func.sum(ShipmentDailyStats.count)
+    ).where(ShipmentDailyStats.created_by == user_id)
 
-@router.get("/status-trend")
-def get_status_trend(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    results = (
-        db.query(
-            func.date(Shipment.created_at).label("date"),
-            Shipment.status,
-            func.count(Shipment.id)
-        )
-        .filter(Shipment.created_by == current_user.id)
-        .group_by("date", Shipment.status)
-        .order_by("date")
-        .all()
+    if date_from:
+        query = query.where(ShipmentDailyStats.day >= date_from)
+    if date_to:
+        query = query.where(ShipmentDailyStats.day <= date_to)
+
+    results = await db.execute(
+        query
+        .group_by(ShipmentDailyStats.day, ShipmentDailyStats.status)
+        .having(func.sum(ShipmentDailyStats.count) > 0)
+        .order_by(ShipmentDailyStats.day)
     )
 
     trend_data = defaultdict(lambda: defaultdict(int))
 
-    for date, status, count in results:
-        trend_data[str(date)][status.value] = count
+    for day, status, count in results:
+        trend_data[str(day)][status.value] = int(count)
 
-    return JSONResponse(content=trend_data)
+    return trend_data
 
-@router.get("/top-routes", response_model=Dict[str, int])
-def get_top_routes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    results = (
-        db.query(
+
+def monthly_from_status_trend(trend_data: Dict[str, Dict[str, int]], year: int) -> Dict[str, int]:
+    """Fold a daily status trend into per-month totals for one year."""
+    monthly = defaultdict(int)
+    for day, counts in trend_data.items():
+        day = datetime.strptime(day, "%Y-%m-%d")
+        if day.year == year:
+            monthly[str(day.month)] += sum(counts.values())
+    return {month: monthly[month] for month in sorted(monthly, key=int)}
+
+
+async def query_provider_count(db: AsyncSession, user_id) -> Dict[str, int]:
+    results = await db.execute(
+        select(ShippingProvider.name, func.count(Shipment.id))
+        .join(Shipment, Shipment.provider_id == ShippingProvider.id)
+        # Other users may ship with these providers; only the user's own
+        # shipments move their data version
+        .where(ShippingProvider.created_by == user_id, Shipment.created_by == user_id)
+        .group_by(ShippingProvider.name)
+    )
+    return {name: count for name, count in results}
+
+
+async def query_top_routes(db: AsyncSession, user_id) -> Dict[str, int]:
+    results = await db.execute(
+        select(
             Shipment.origin,
             Shipment.destination,
             func.count(Shipment.id).label("count")
         )
-        .filter(Shipment.created_by == current_user.id)
+        .where(Shipment.created_by == user_id)
         .group_by(Shipment.origin, Shipment.destination)
         .order_by(func.count(Shipment.id).desc())
         .limit(5)
-        .all()
     )
 
     return {
         f"{origin} → {destination}": count
         for origin, destination, count in results
     }
+
+
+async def query_monthly_trends(db: AsyncSession, user_id, year: int) -> Dict[str, int]:
+    month = extract('month', ShipmentDailyStats.day)
+    results = await db.execute(
+        select(month, func.sum(ShipmentDailyStats.count))
+        .where(
+            ShipmentDailyStats.created_by == user_id,
+            ShipmentDailyStats.day >= date(year, 1, 1),
+            ShipmentDailyStats.day < date(year + 1, 1, 1)
+        )
+        .group_by(month)
+        .having(func.sum(ShipmentDailyStats.count) > 0)
+        .order_by(month)
+    )
+    return {str(int(month)): int(count) for month, count in results}
+
+
+async def query_delivery_time(
+    db: AsyncSession,
+    user_id,
+    provider_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> DeliveryTimeStats:
+    """Delivery time aggregates computed entirely in the database."""
+    query = select(
+        func.count(Shipment.id),
+        func.avg(delivery_days),
+        func.percentile_cont(0.5).within_group(delivery_days),
+        func.percentile_cont(0.9).within_group(delivery_days),
+        func.percentile_cont(0.95).within_group(delivery_days),
+    ).where(
+        Shipment.created_by == user_id,
+        Shipment.status == ShipmentStatus.delivered,
+        Shipment.estimated_delivery != None
+    )
+
+    if provider_id:
+        query = query.where(Shipment.provider_id == provider_id)
+    if date_from:
+        query = query.where(Shipment.created_at >= date_from)
+    if date_to:
+        query = query.where(Shipment.created_at <= date_to)
+
+    delivered, average, median, p90, p95 = (await db.execute(query)).one()
+
+    return DeliveryTimeStats(
+        delivered=delivered,
+        average_delivery_time=round(float(average or 0), 2),
+        median_delivery_time=round(float(median or 0), 2),
+        p90_delivery_time=round(float(p90 or 0), 2),
+        p95_delivery_time=round(float(p95 or 0), 2),
+    )
+
+
+async def build_dashboard(db: AsyncSession, user_id, year: int) -> AnalyticsDashboard:
+    summary, average_delivery_time = await query_overview(db, user_id)
+    status_trend = await query_status_trend(db, user_id)
+
+    return AnalyticsDashboard(
+        summary=summary,
+        monthly_trends=monthly_from_status_trend(status_trend, year),
+        average_delivery_time=average_delivery_time,
+        provider_count=await query_provider_count(db, user_id),
+        status_trend=status_trend,
+        top_routes=await query_top_routes(db, user_id),
+    )
+
+
+@router.get("/dashboard", response_model=AnalyticsDashboard)
+async def get_dashboard(
+    data_version: int = Depends(conditional_get_this_year),
+    year: int = Depends(current_year),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Everything the Analytics page needs, in one request and four queries."""
+    return await cached(
+        current_user.id,
+        data_version,
+        ("dashboard", year),
+        lambda: build_dashboard(db, current_user.id, year)
+    )
+
+@router.get("/summary", response_model=ShipmentSummary)
+async def get_shipment_summary(
+    data_version: int = Depends(conditional_get),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await cached(current_user.id, data_version, "summary", lambda: query_summary(db, current_user.id))
+
+@router.get("/monthly-trends", response_model=Dict[str, int])
+async def monthly_shipment_trends(
+    data_version: int = Depends(conditional_get_this_year),
+    year: int = Depends(current_year),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await cached(
+        current_user.id,
+        data_version,
+        ("monthly-trends", year),
+        lambda: query_monthly_trends(db, current_user.id, year)
+    )
+
+@router.get("/average-delivery-time", response_model=DeliveryTimeStats)
+async def average_delivery_time(
+    provider_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    data_version: int = Depends(conditional_get),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await cached(
+        current_user.id,
+        data_version,
+        ("average-delivery-time", provider_id, date_from, date_to),
+        lambda: query_delivery_time(db, current_user.id, provider_id, date_from, date_to)
+    )
+
+@router.get("/provider-count", response_model=Dict[str, int])
+async def provider_wise_shipment_count(
+    data_version: int = Depends(conditional_get),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await cached(current_user.id, data_version, "provider-count", lambda: query_provider_count(db, current_user.id))
+
+@router.get("/status-trend")
+async def get_status_trend(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    data_version: int = Depends(conditional_get),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    trend_data = await cached(
+        current_user.id,
+        data_version,
+        ("status-trend", date_from, date_to),
+        lambda: query_status_trend(db, current_user.id, date_from, date_to)
+    )
+    return trend_data
+
+@router.get("/top-routes", response_model=Dict[str, int])
+async def get_top_routes(
+    data_version: int = Depends(conditional_get),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await cached(current_user.id, data_version, "top-routes", lambda: query_top_routes(db, current_user.id))
+
+@router.get("/cache-stats")
+async def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit/miss counters of the analytics response cache (this process only)."""
+    return analytics_cache.stats()
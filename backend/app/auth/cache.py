@@ -0,0 +1,57 @@
+# app/auth/cache.py
+
+"""
+In-process cache of authenticated users, keyed by user id.
+
+get_current_user() only opens a database session on a miss. Committed
+ORM updates or deletes of a User drop that user's entry; other workers
+pick the change up once their entry expires
+(AUTH_PRINCIPAL_CACHE_TTL_SECONDS). Bulk UPDATE/DELETE statements bypass
+the ORM events, so call invalidate_principal() after those.
+
+Cached users are detached instances shared between requests: read them,
+never add them to a session.
+"""
+
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+principal_cache = TTLCache(
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def get_principal(user_id) -> Optional[User]:
+    return principal_cache.get(user_id, None)
+
+
+def cache_principal(user: User):
+    principal_cache.set(user.id, user)
+
+
+def invalidate_principal(user_id):
+    principal_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _remember_changed_user(mapper, connection, target):
+    object_session(target).info.setdefault("changed_users", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_users", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
@@ -0,0 +1,109 @@
+# app/auth/hashing.py
+
+"""
+bcrypt on a dedicated process pool.
+
+Hashing and verifying passwords is deliberately slow CPU work. Run in the
+request threadpool, a burst of logins starves every other endpoint; run in
+a separate pool of worker processes, it competes only with itself. At most
+PASSWORD_HASH_MAX_PENDING calls per worker process may be running or
+queued; past that, callers get a 503 straight away instead of joining an
+ever-growing queue. If a worker process dies, the calls it takes down get
+a 503 too and the next call starts a fresh pool.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from app.auth.utils import hash_password, verify_password
+from app.core.config import settings
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.seconds_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the app never starts processes;
+        # spawn rather than fork, since the parent already runs threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent sign-ins, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+
+        start = time.perf_counter()
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker was killed (OOM killer, crash); a broken pool fails
+            # every call from now on, so replace it unless a concurrent
+            # caller already has
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+                    self.restarts += 1
+            executor.shutdown(wait=False)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Sign-in is temporarily unavailable, please retry",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.seconds_total += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                # Includes time spent queued behind other calls
+                "latency_ms_avg": round(self.seconds_total / self.completed * 1000, 3) if self.completed else 0.0,
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -1,61 +1,130 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi import APIRouter, HTTPException, Depends, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.database import AsyncSessionLocal
 from app.models.user import User
-from app.auth.utils import hash_password, verify_password, create_access_token
+from app.models.refresh_token import RefreshToken
+from app.auth.utils import create_access_token, generate_refresh_token, hash_refresh_token
+from app.auth.hashing import password_hasher
 from app.schemas.user import RegisterRequest 
 from fastapi.security import OAuth2PasswordRequestForm
-from app.schemas.user import LoginRequest
+from app.schemas.user import LoginRequest, RefreshRequest
 
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def issue_tokens(db: AsyncSession, user: User, family_id=None) -> dict:
+    """Access token plus a new refresh token; the caller commits."""
+    refresh_token, token_hash = generate_refresh_token()
+    db.add(RefreshToken(
+        user_id=user.id,
+        token_hash=token_hash,
+        family_id=family_id or uuid4(),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+async def revoke_family(db: AsyncSession, family_id):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at == None)
+        .values(revoked_at=datetime.utcnow())
+    )
 
 @router.post("/register")
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
+    user = (await db.execute(select(User).filter(User.email == request.email))).scalars().first()
     if user:
         raise HTTPException(status_code=400, detail="User already exists")
+    # Don't hold a pooled connection while waiting on bcrypt
+    await db.close()
     
     new_user = User(
         email=request.email,
-        password_hash=hash_password(request.password),
+        password_hash=await password_hasher.hash(request.password),
         name=request.name
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     return {"message": "User registered successfully"}
 
 
 
 
 @router.post("/login")
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user or not verify_password(request.password, user.password_hash):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = (await db.execute(select(User).filter(User.email == request.email))).scalars().first()
+    await db.close()
+    if not user or not await password_hasher.verify(request.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    access_token = create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    tokens = issue_tokens(db, user)
+    await db.commit()
+    return tokens
 
 
 
 
 @router.post("/token")
-def token_login(
+async def token_login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = (await db.execute(select(User).filter(User.email == form_data.username))).scalars().first()
+    await db.close()
+    if not user or not await password_hasher.verify(form_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    access_token = create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    tokens = issue_tokens(db, user)
+    await db.commit()
+    return tokens
+
+
+@router.post("/refresh")
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Trade a refresh token for a new access token and a new refresh token."""
+    token = (await db.execute(
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(request.refresh_token))
+        .with_for_update()
+    )).scalars().first()
+
+    if not token or token.expires_at <= datetime.utcnow():
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if token.revoked_at is not None:
+        # A token that was already rotated out came back: assume it leaked
+        # and end the whole login it belongs to
+        await revoke_family(db, token.family_id)
+        await db.commit()
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user = await db.get(User, token.user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    token.revoked_at = datetime.utcnow()
+    tokens = issue_tokens(db, user, token.family_id)
+    await db.commit()
+    return tokens
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke the refresh token and every token rotated from the same login."""
+    token = (await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(request.refresh_token))
+    )).scalars().first()
+
+    if token:
+        await revoke_family(db, token.family_id)
+        await db.commit()
@@ -1,9 +1,61 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings # type: ignore
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
 
+    # Applied to each engine, so one worker process can hold up to
+    # 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 10000
+
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    TRACKING_CACHE_TTL_SECONDS: int = 60
+    TRACKING_CACHE_MAX_ENTRIES: int = 50000
+    TRACKING_RATE_LIMIT_PER_MINUTE: int = 60
+    TRACKING_RATE_LIMIT_BURST: int = 20
+
+    # Per-stream backlog before GET /shipments/events falls back to "reset"
+    SHIPMENT_EVENTS_QUEUE_SIZE: int = 1000
+    SHIPMENT_EVENTS_MAX_STREAMS_PER_USER: int = 10
+    SHIPMENT_EVENTS_HEARTBEAT_SECONDS: float = 15
+
+    # Carrier status events: POST /track/events with X-Carrier-Key; disabled when unset
+    CARRIER_INGEST_API_KEY: Optional[str] = None
+    CARRIER_EVENT_QUEUE_MAX: int = 200000
+    CARRIER_EVENT_BATCH_SIZE: int = 5000
+    CARRIER_EVENT_FLUSH_INTERVAL_SECONDS: float = 0.5
+
+    # Delivered/cancelled shipments created longer ago than this move to
+    # the archive partition when `python -m app.shipment.archive` runs
+    SHIPMENT_ARCHIVE_AFTER_DAYS: int = 90
+    SHIPMENT_ARCHIVE_BATCH_SIZE: int = 1000
+    SHIPMENT_PARTITION_MONTHS_AHEAD: int = 3
+
+    # Largest body POST /shipments/import accepts
+    SHIPMENT_IMPORT_MAX_BYTES: int = 100 * 1024 * 1024
+
+    # Sign-in throughput is bounded by cores, so size WORKERS to the cores
+    # one app process may use. MAX_PENDING only trades waiting for shedding:
+    # an admitted login waits up to about MAX_PENDING * hash time / WORKERS
+    # (16 * 0.25s / 2 = 2s on a typical core), and the rest get a fast 503.
+    # See scripts/bench_login_storm.py
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
     class Config:
         env_file = ".env"
 
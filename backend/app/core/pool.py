@@ -0,0 +1,85 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Checkout counters for one connection pool (this process only)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def begin(self):
+        with self._lock:
+            self.waiting += 1
+
+    def end(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            self.waiting -= 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+
+class InstrumentedPoolMixin:
+    """
+    Time every checkout and count the ones that hit pool_timeout.
+
+    The wait includes opening a new connection when the pool grows, so a
+    rising average with no timeouts usually means slow connects rather
+    than an exhausted pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        self.metrics.begin()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.end(time.perf_counter() - start, timed_out=True)
+            raise
+        except Exception:
+            self.metrics.end(time.perf_counter() - start)
+            raise
+        self.metrics.end(time.perf_counter() - start)
+        return connection
+
+    def stats(self) -> dict:
+        metrics = self.metrics
+        with metrics._lock:
+            attempts = metrics.checkouts + metrics.timeouts
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                # QueuePool counts overflow from -pool_size until the pool is full
+                "overflow": max(self.overflow(), 0),
+                "waiting": metrics.waiting,
+                "checkouts": metrics.checkouts,
+                "timeouts": metrics.timeouts,
+                "wait_ms_avg": round(metrics.wait_seconds_total / attempts * 1000, 3) if attempts else 0.0,
+                "wait_ms_max": round(metrics.wait_seconds_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,46 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket per key (usually a client address).
+
+    Each key may make `burst` calls at once and then `rate_per_minute`
+    calls per minute. Only the `max_keys` most recently seen keys are
+    tracked, so memory stays bounded under address churn.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_keys: int = 100000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def allow(self, key: Hashable) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                self.rejected += 1
+                return False
+            bucket[0] = tokens - 1
+            return True
+
+    def retry_after(self) -> int:
+        """Seconds until an exhausted bucket has a token again."""
+        return max(1, round(1 / self.rate)) if self.rate else 60
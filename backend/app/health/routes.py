@@ -0,0 +1,45 @@
+# app/health/routes.py
+
+from fastapi import APIRouter
+
+from app.auth.hashing import password_hasher
+from app.database import async_engine, engine
+from app.shipment.events import shipment_events
+from app.tracking.cache import tracking_cache
+from app.tracking.ingest import carrier_events
+from app.tracking.routes import tracking_rate_limiter
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    """Connection pool usage of this worker process, per engine."""
+    return {
+        "requests": async_engine.sync_engine.pool.stats(),
+        "background": engine.pool.stats(),
+    }
+
+
+@router.get("/password-hashing")
+async def get_password_hashing_stats():
+    """Load on the bcrypt worker pool of this worker process."""
+    return password_hasher.stats()
+
+
+@router.get("/tracking")
+async def get_tracking_stats():
+    """Public tracking lookup cache and rate limiter of this worker process."""
+    return {**tracking_cache.stats(), "rate_limited": tracking_rate_limiter.rejected}
+
+
+@router.get("/carrier-events")
+async def get_carrier_event_stats():
+    """Carrier event queue and flusher of this worker process."""
+    return carrier_events.stats()
+
+
+@router.get("/shipment-events")
+async def get_shipment_event_stats():
+    """Open shipment event streams of this worker process."""
+    return shipment_events.stats()
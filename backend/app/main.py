@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
@@ -6,9 +9,27 @@ from fastapi.security import OAuth2PasswordBearer
 from app.auth.routes import router as auth_router
 from app.shipment.routes import shipment_router, provider_router
 from app.analytics.routes import router as analytics_router  # ✅ NEW
+from app.health.routes import router as health_router
+from app.tracking.routes import router as tracking_router
+from app.tracking.ingest import carrier_events
+from app.shipment.purge import resume_purge_jobs
+from app.shipment.archive import ensure_partitions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    carrier_events.start()
+    loop = asyncio.get_running_loop()
+    # Month partitions for the coming months, in case the archive cron isn't running
+    loop.run_in_executor(None, ensure_partitions)
+    # Finish delete-all jobs a previous process was killed in the middle of
+    loop.run_in_executor(None, resume_purge_jobs)
+    yield
+    await carrier_events.stop()
+
 
 # Create FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Define OAuth2 token URL for Swagger (Authorize button) support
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -32,3 +53,5 @@ app.include_router(shipment_router, prefix="/shipments", tags=["Shipments"])
 app.include_router(provider_router, prefix="/providers", tags=["Shipping Providers"])
 
 app.include_router(analytics_router, prefix="/analytics", tags=["Analytics"])  # ✅ NEW
+app.include_router(tracking_router, prefix="/track", tags=["Tracking"])
+app.include_router(health_router, prefix="/health", tags=["Health"])
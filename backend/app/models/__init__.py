@@ -2,3 +2,6 @@ from .user import User
 from .shipment import Shipment, ShipmentStatus
 from .shipping_provider import ShippingProvider
 from .status_history import StatusHistory
+from .job import Job, JobStatus
+from .shipment_daily_stats import ShipmentDailyStats
+from .refresh_token import RefreshToken
@@ -0,0 +1,33 @@
+# app/models/job.py
+
+import enum
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+# Job Status Enum
+class JobStatus(str, enum.Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)  # e.g. "shipment_import"
+    status = Column(Enum(JobStatus), default=JobStatus.pending, nullable=False)
+
+    rows_processed = Column(Integer, default=0, nullable=False)
+    rows_total = Column(Integer, nullable=True)  # when known up front (purges)
+    rows_failed = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON, default=list, nullable=False)  # [{"line": 12, "error": "..."}]
+    detail = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -3,7 +3,7 @@
 import enum
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Float
+from sqlalchemy import Boolean, Column, String, DateTime, Enum, ForeignKey, Float, Index, false, func, literal_column, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -18,29 +18,74 @@ class ShipmentStatus(str, enum.Enum):
     cancelled = "cancelled"
 
 class Shipment(Base):
+    # Partitioned (see app.shipment.archive): the database primary key is
+    # (id, created_at, archived) and shipment_id/tracking_id can only have
+    # per-partition unique indexes, so theirs are plain
     __tablename__ = "shipments"
+    __table_args__ = (
+        # Every read is scoped to created_by first
+        Index("ix_shipments_created_by_created_at_id", "created_by", "created_at", "id"),
+        Index("ix_shipments_created_by_status", "created_by", "status"),
+        Index("ix_shipments_created_by_provider_id", "created_by", "provider_id"),
+        # Trigram indexes serve the substring (ILIKE '%...%') filters in search
+        Index("ix_shipments_origin_trgm", "origin", postgresql_using="gin", postgresql_ops={"origin": "gin_trgm_ops"}),
+        Index("ix_shipments_destination_trgm", "destination", postgresql_using="gin", postgresql_ops={"destination": "gin_trgm_ops"}),
+        Index(
+            "ix_shipments_search_vector",
+            text("to_tsvector('simple'::regconfig, origin || ' ' || destination || ' ' || coalesce(description, ''))"),
+            postgresql_using="gin",
+        ),
+        # Archival walks the closed shipments still active, oldest first
+        Index(
+            "ix_shipments_archivable_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("NOT archived AND status IN ('delivered', 'cancelled')"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
-    shipment_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
-    tracking_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
+    shipment_id = Column(UUID(as_uuid=True), index=True, nullable=False, default=uuid.uuid4)
+    tracking_id = Column(UUID(as_uuid=True), index=True, nullable=False, default=uuid.uuid4)
     external_tracking_id = Column(String, nullable=True, index=True)  # Optional user-provided tracking ID
 
     origin = Column(String, nullable=False)
     destination = Column(String, nullable=False)
     status = Column(Enum(ShipmentStatus), default=ShipmentStatus.pending, nullable=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     estimated_delivery = Column(DateTime, nullable=True)
+    # Timestamp of the newest carrier event applied; older ones are ignored
+    carrier_event_at = Column(DateTime, nullable=True)
+    # Closed and old: lives in the shipments_archive partition
+    archived = Column(Boolean, default=False, server_default=false(), nullable=False)
 
     weight_kg = Column(Float, nullable=True)
     dimensions = Column(String, nullable=True)
     description = Column(String, nullable=True)
 
-    provider_id = Column(UUID(as_uuid=True), ForeignKey("shipping_providers.id"))
+    provider_id = Column(UUID(as_uuid=True), ForeignKey("shipping_providers.id"), index=True)
     provider = relationship("ShippingProvider")
 
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     creator = relationship("User")
 
-    status_history = relationship("StatusHistory", back_populates="shipment", cascade="all, delete")
+    # No foreign key into a partitioned table: deleting a shipment must delete
+    # its status_history rows explicitly
+    status_history = relationship(
+        "StatusHistory",
+        back_populates="shipment",
+        primaryjoin="Shipment.id == foreign(StatusHistory.shipment_id)",
+        passive_deletes=True,
+    )
+
+# Full-text document for /shipments/search?q=...; must stay in sync with the
+# ix_shipments_search_vector expression above for the index to apply. The
+# constants are inlined rather than bound so that asyncpg's server-side
+# prepared statements still match the index under a generic plan.
+shipment_search_vector = func.to_tsvector(
+    literal_column("'simple'::regconfig"),
+    Shipment.origin + literal_column("' '") + Shipment.destination + literal_column("' '")
+    + func.coalesce(Shipment.description, literal_column("''")),
+)
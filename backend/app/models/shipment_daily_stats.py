@@ -0,0 +1,17 @@
+# app/models/shipment_daily_stats.py
+
+from sqlalchemy import Column, Date, Enum, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from .shipment import ShipmentStatus
+
+class ShipmentDailyStats(Base):
+    """Per-day shipment counts, maintained by the shipment write paths."""
+    __tablename__ = "shipment_daily_stats"
+
+    created_by = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(ShipmentStatus), primary_key=True)
+    provider_id = Column(UUID(as_uuid=True), primary_key=True)  # nil UUID when unassigned
+
+    count = Column(Integer, nullable=False, default=0)
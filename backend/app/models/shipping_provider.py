@@ -17,5 +17,5 @@ class ShippingProvider(Base):
     contact_email = Column(String, nullable=True)
     phone = Column(String, nullable=True)
 
-    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     creator = relationship("User", backref="providers")
@@ -1,6 +1,6 @@
 # app/models/status_history.py
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, DateTime, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -10,10 +10,15 @@ from .shipment import ShipmentStatus
 
 class StatusHistory(Base):
     __tablename__ = "status_history"
+    __table_args__ = (
+        Index("ix_status_history_shipment_id_timestamp", "shipment_id", "timestamp"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    shipment_id = Column(UUID(as_uuid=True), ForeignKey("shipments.id", ondelete="CASCADE"))
+    shipment_id = Column(UUID(as_uuid=True))  # shipments.id; not enforced, shipments is partitioned
     status = Column(Enum(ShipmentStatus), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
-    shipment = relationship("Shipment", back_populates="status_history")
+    shipment = relationship(
+        "Shipment", back_populates="status_history", primaryjoin="foreign(StatusHistory.shipment_id) == Shipment.id"
+    )
@@ -1,6 +1,6 @@
 # app/models/user.py
 
-from sqlalchemy import Column, String
+from sqlalchemy import BigInteger, Column, String
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from app.database import Base
@@ -12,3 +12,5 @@ class User(Base):
     email = Column(String, unique=True, nullable=False, index=True)
     password_hash = Column(String, nullable=False)
     name = Column(String, nullable=True)
+    # Bumped by every write to the user's shipments or providers; backs ETags
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Dict
 
 class ShipmentSummary(BaseModel):
     total: int
@@ -7,3 +8,19 @@ class ShipmentSummary(BaseModel):
     in_transit: int
     delayed: int
     cancelled: int
+
+class DeliveryTimeStats(BaseModel):
+    """Days from creation to delivery over delivered shipments."""
+    delivered: int
+    average_delivery_time: float
+    median_delivery_time: float
+    p90_delivery_time: float
+    p95_delivery_time: float
+
+class AnalyticsDashboard(BaseModel):
+    summary: ShipmentSummary
+    monthly_trends: Dict[str, int]
+    average_delivery_time: float
+    provider_count: Dict[str, int]
+    status_trend: Dict[str, Dict[str, int]]
+    top_routes: Dict[str, int]
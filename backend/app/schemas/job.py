@@ -0,0 +1,28 @@
+# app/schemas/job.py
+
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+from app.models.job import JobStatus
+
+class JobRowError(BaseModel):
+    line: int
+    error: str
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: JobStatus
+
+    rows_processed: int
+    rows_total: Optional[int] = None
+    rows_failed: int
+    errors: List[JobRowError] = []
+    detail: Optional[str] = None
+
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
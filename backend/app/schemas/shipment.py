@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime, date
 from uuid import UUID
 from app.models.shipment import ShipmentStatus
@@ -38,6 +38,46 @@ class ShipmentResponse(BaseModel):
     description: Optional[str] = None
 
     created_at: datetime
+    archived: bool = False
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ShipmentPage(BaseModel):
+    items: List[ShipmentResponse]
+    next_cursor: Optional[str] = None
+
+class StatusEvent(BaseModel):
+    status: ShipmentStatus
+    timestamp: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class ShipmentTimeline(BaseModel):
+    shipment_id: UUID
+    events: List[StatusEvent]
+
+class ShipmentFilter(BaseModel):
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    status: Optional[ShipmentStatus] = None
+    provider_id: Optional[UUID] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
+class BulkShipmentUpdate(BaseModel):
+    # Exactly one of ids (public or internal) and filter
+    ids: Optional[List[UUID]] = None
+    filter: Optional[ShipmentFilter] = None
+    status: Optional[ShipmentStatus] = None
+    estimated_delivery: Optional[date] = None
+
+class BulkUpdateResult(BaseModel):
+    id: UUID
+    result: Literal["updated", "unchanged", "not_found"]
+
+class BulkUpdateResponse(BaseModel):
+    matched: int
+    updated: int
+    results: List[BulkUpdateResult]
@@ -0,0 +1,22 @@
+# app/schemas/tracking.py
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date, datetime
+from uuid import UUID
+from app.models.shipment import ShipmentStatus
+
+class TrackingResponse(BaseModel):
+    tracking_id: UUID
+    status: ShipmentStatus
+    estimated_delivery: Optional[date] = None
+    provider_name: Optional[str] = None
+    tracking_url: Optional[str] = None
+
+class CarrierEvent(BaseModel):
+    external_tracking_id: str = Field(..., max_length=128)
+    status: ShipmentStatus
+    timestamp: datetime
+
+class CarrierEventsAccepted(BaseModel):
+    accepted: int
@@ -0,0 +1,175 @@
+# app/shipment/archive.py
+
+"""
+Monthly partitions of the shipments table, and archival of closed shipments.
+
+The table is partitioned twice:
+
+    shipments                      LIST (archived)
+      shipments_active             archived = false, RANGE (created_at)
+        shipments_active_yYYYYmMM  one per month
+        shipments_active_default   rows no month partition covers yet
+      shipments_archive            archived = true
+
+Archiving is just `UPDATE ... SET archived = true`, which Postgres turns
+into a move between partitions, so every query that doesn't filter on
+archived (lookups by id, timelines, tracking, exports, analytics) sees
+archived shipments as before. Hot list routes filter on archived = false
+and on created_at, which prunes the archive and any months outside the
+requested dates, so their indexes stay small. Run from cron with:
+
+    python -m app.shipment.archive [--days 90] [--batch-size 1000]
+
+which also creates the month partitions SHIPMENT_PARTITION_MONTHS_AHEAD
+months in advance; the app does the same on startup.
+"""
+
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import false, func, select, text, true, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.shipment import Shipment, ShipmentStatus
+from app.shipment.versions import touch_data_versions
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_PARTITION = "shipments_active"
+DEFAULT_PARTITION = "shipments_active_default"
+CLOSED_STATUSES = (ShipmentStatus.delivered, ShipmentStatus.cancelled)
+
+# pg_advisory_xact_lock key serializing partition creation across workers
+PARTITION_LOCK_KEY = 0x5E1A7C0
+# CREATE TABLE ... PARTITION OF needs an exclusive lock on shipments_active;
+# give up rather than queue every shipment query behind a long transaction
+PARTITION_LOCK_TIMEOUT = "5s"
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{ACTIVE_PARTITION}_y{month:%Y}m{month:%m}"
+
+
+def create_month_partition(db: Session, month: datetime) -> bool:
+    """Create the partition for one month unless it exists; True if created."""
+    name = partition_name(month)
+    if db.execute(select(func.to_regclass(name))).scalar() is not None:
+        return False
+
+    bounds = {"start": month, "end": add_months(month, 1)}
+    # Postgres refuses to attach a range the default partition holds rows
+    # for, so park those rows, create the partition and route them back
+    db.execute(text(
+        f"CREATE TEMP TABLE parked AS "
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *) "
+        f"SELECT * FROM moved"
+    ), bounds)
+    db.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {ACTIVE_PARTITION} "
+        f"FOR VALUES FROM ('{bounds['start']:%Y-%m-%d}') TO ('{bounds['end']:%Y-%m-%d}')"
+    ))
+    db.execute(text(f"INSERT INTO {ACTIVE_PARTITION} SELECT * FROM parked"))
+    db.execute(text("DROP TABLE parked"))
+    return True
+
+
+def ensure_partitions(months_ahead: int = settings.SHIPMENT_PARTITION_MONTHS_AHEAD) -> int:
+    """Create this month's partition and the next months_ahead; returns how many were new."""
+    db = SessionLocal()
+    try:
+        db.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_KEY)))
+        db.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+        current = month_start(datetime.utcnow())
+        created = sum(create_month_partition(db, add_months(current, i)) for i in range(months_ahead + 1))
+        db.commit()
+        return created
+    finally:
+        db.close()
+
+
+def archive_closed_shipments(
+    older_than: timedelta = timedelta(days=settings.SHIPMENT_ARCHIVE_AFTER_DAYS),
+    batch_size: int = settings.SHIPMENT_ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    Move delivered and cancelled shipments created before now - older_than
+    to the archive partition, in batches; returns how many moved.
+
+    Each batch is its own short transaction, like purges. Archiving leaves
+    the analytics rollup alone (the shipments still exist), but list
+    responses change, so the owners' data versions are bumped. A PATCH
+    racing the move of the same row fails with a serialization error rather
+    than updating a stale copy.
+    """
+    cutoff = datetime.utcnow() - older_than
+    # Matches the predicate of ix_shipments_archivable_created_at_id, so
+    # each batch reads the next batch_size keys from that index instead of
+    # sorting every old month again
+    candidates = (
+        Shipment.archived == false(),
+        Shipment.status.in_(CLOSED_STATUSES),
+        Shipment.created_at < cutoff,
+    )
+    archived = 0
+    after = None
+    db = SessionLocal()
+    try:
+        while True:
+            query = select(Shipment.id, Shipment.created_at).where(*candidates)
+            if after is not None:
+                query = query.where(tuple_(Shipment.created_at, Shipment.id) > after)
+            keys = db.execute(
+                query
+                .order_by(Shipment.created_at, Shipment.id)
+                .limit(batch_size)
+                # Rows being written right now wait for the next run
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not keys:
+                break
+            after = (keys[-1].created_at, keys[-1].id)
+
+            owners = db.execute(
+                update(Shipment)
+                .where(
+                    *candidates,
+                    # created_at bounds keep the UPDATE to the months it touches
+                    Shipment.created_at.between(keys[0].created_at, after[0]),
+                    Shipment.id.in_([key.id for key in keys]),
+                )
+                .values(archived=true())
+                .returning(Shipment.created_by)
+            ).scalars().all()
+            touch_data_versions(db, {owner for owner in owners if owner is not None})
+            db.commit()
+
+            archived += len(owners)
+            logger.info("Archived %d shipments", archived)
+        return archived
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401  (register every mapper)
+
+    parser = argparse.ArgumentParser(description="Archive closed shipments and create upcoming month partitions")
+    parser.add_argument("--days", type=int, default=settings.SHIPMENT_ARCHIVE_AFTER_DAYS,
+                        help="archive delivered/cancelled shipments created more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=settings.SHIPMENT_ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"Created {ensure_partitions()} partitions")
+    print(f"Archived {archive_closed_shipments(timedelta(days=args.days), args.batch_size)} shipments")
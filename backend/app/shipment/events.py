@@ -0,0 +1,195 @@
+# app/shipment/events.py
+
+"""
+In-process pub/sub of shipment changes, streamed to dashboards over SSE.
+
+Write paths call the publish_* helpers after they commit; each open
+GET /shipments/events stream of the owning user receives a small JSON
+delta:
+
+    {"type": "created", "shipments": [<ShipmentResponse>, ...]}
+    {"type": "updated", "shipments": [{"id", "shipment_id", "status", "old_status", ...}]}
+    {"type": "deleted", "shipments": [{"id", "shipment_id", "status"}]}
+    {"type": "reset"}
+
+"reset" means the client should refetch: it opens every stream and
+replaces the backlog of a stream that falls more than
+SHIPMENT_EVENTS_QUEUE_SIZE events behind, so a slow reader costs a
+bounded amount of memory and never slows down writers. Publishing is a
+no-op for users with no open stream. Streams only see writes made by the
+same worker process.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+from collections.abc import Mapping
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.schemas.shipment import ShipmentResponse
+
+RESET = json.dumps({"type": "reset"})
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class Subscription:
+    def __init__(self, max_size: int):
+        self.loop = asyncio.get_running_loop()
+        self.max_size = max_size
+        self.messages = deque()
+        self.ready = asyncio.Event()
+        self.reset_pending = False
+        self.overflows = 0
+
+    def deliver(self, message: str):
+        # Runs on the subscriber's loop
+        if self.reset_pending:
+            # The client refetches once it reads the reset; that covers this too
+            return
+        if message is RESET or len(self.messages) >= self.max_size:
+            if message is not RESET:
+                self.overflows += 1
+            self.messages.clear()
+            self.messages.append(RESET)
+            self.reset_pending = True
+        else:
+            self.messages.append(message)
+        self.ready.set()
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """Next message, or None if nothing arrived within timeout."""
+        if not self.messages:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        message = self.messages.popleft()
+        if message is RESET:
+            self.reset_pending = False
+        return message
+
+
+class ShipmentEventBroker:
+    def __init__(self, queue_size: int, max_streams_per_user: int):
+        self.queue_size = queue_size
+        self.max_streams_per_user = max_streams_per_user
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def check_capacity(self, user_id):
+        """Raise 429 if user_id already has max_streams_per_user streams open."""
+        with self._lock:
+            if len(self._subscribers.get(user_id, ())) >= self.max_streams_per_user:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many open event streams",
+                )
+
+    def subscribe(self, user_id) -> Optional[Subscription]:
+        """A new stream for user_id, or None if they have no room left for one."""
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if len(self._subscribers[user_id]) >= self.max_streams_per_user:
+                return None
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def listening(self, user_id) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id, message: str):
+        """Queue an encoded message for every stream of user_id; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        if not subscribers:
+            return
+        self.published += 1
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for subscription in subscribers:
+            if subscription.loop is current:
+                subscription.deliver(message)
+            else:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = len(self._subscribers)
+            subscriptions = [s for subscribers in self._subscribers.values() for s in subscribers]
+        return {
+            "users": users,
+            "streams": len(subscriptions),
+            "backlog_max": max((len(s.messages) for s in subscriptions), default=0),
+            "overflows": sum(s.overflows for s in subscriptions),
+            "published": self.published,
+        }
+
+
+shipment_events = ShipmentEventBroker(
+    queue_size=settings.SHIPMENT_EVENTS_QUEUE_SIZE,
+    max_streams_per_user=settings.SHIPMENT_EVENTS_MAX_STREAMS_PER_USER,
+)
+
+UPDATE_FIELDS = ("id", "shipment_id", "status", "old_status", "estimated_delivery")
+DELETE_FIELDS = ("id", "shipment_id", "status")
+
+
+def _fields(row, keys) -> dict:
+    if isinstance(row, Mapping):
+        return {key: row[key] for key in keys if key in row}
+    return {key: getattr(row, key) for key in keys if hasattr(row, key)}
+
+
+def _publish(user_id, kind: str, shipments: list):
+    if shipments:
+        shipment_events.publish(user_id, json.dumps({"type": kind, "shipments": shipments}, default=_encode))
+
+
+def publish_created(user_id, shipments: Iterable):
+    """New shipments (ORM objects or full column mappings)."""
+    if shipment_events.listening(user_id):
+        _publish(user_id, "created", [
+            ShipmentResponse.model_validate(
+                dict(shipment) if isinstance(shipment, Mapping) else shipment, from_attributes=True
+            ).model_dump()
+            for shipment in shipments
+        ])
+
+
+def publish_updated(user_id, rows: Iterable):
+    """Changed shipments; rows carry whichever of UPDATE_FIELDS changed."""
+    if shipment_events.listening(user_id):
+        _publish(user_id, "updated", [_fields(row, UPDATE_FIELDS) for row in rows])
+
+
+def publish_deleted(user_id, rows: Iterable):
+    if shipment_events.listening(user_id):
+        _publish(user_id, "deleted", [_fields(row, DELETE_FIELDS) for row in rows])
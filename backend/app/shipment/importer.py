@@ -0,0 +1,173 @@
+# app/shipment/importer.py
+
+import csv
+import json
+import os
+import re
+from itertools import islice
+from typing import Iterator, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+from app.analytics.rollup import record_created
+from app.database import SessionLocal
+from app.models.job import Job, JobStatus
+from app.models.shipment import Shipment
+from app.models.status_history import StatusHistory
+from app.models.shipping_provider import ShippingProvider
+from app.schemas.shipment import ShipmentCreate
+from app.shipment.events import publish_created
+from app.shipment.utils import build_creation_events, build_shipment_row
+from app.shipment.versions import touch_data_versions
+from app.tracking.cache import invalidate_tracking
+
+IMPORT_JOB_KIND = "shipment_import"
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# surrogateescape decodes each byte that isn't valid UTF-8 to one of these,
+# which valid UTF-8 never produces
+UNDECODABLE = re.compile("[\udc80-\udcff]")
+NOT_UTF8 = "Line is not valid UTF-8"
+
+# Content types accepted by POST /shipments/import
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def iter_records(path: str, fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line number, raw record) pairs without reading the whole file.
+
+    A record that can't be parsed, or holds bytes that aren't UTF-8, is
+    yielded as a ValueError, so it fails its own row rather than the job.
+    """
+    with open(path, newline="", encoding="utf-8-sig", errors="surrogateescape") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            while True:
+                try:
+                    record = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as e:
+                    # DictReader only updates line_num for good rows; the
+                    # underlying reader carries on with the next line
+                    yield reader.reader.line_num, ValueError(f"Invalid CSV: {e}")
+                    continue
+                if any(UNDECODABLE.search(v) for v in record.values() if isinstance(v, str)):
+                    yield reader.line_num, ValueError(NOT_UTF8)
+                    continue
+                # Blank cells mean "not provided" so schema defaults apply
+                yield reader.line_num, {k: v for k, v in record.items() if k and v not in ("", None)}
+        else:
+            for line_num, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                if UNDECODABLE.search(line):
+                    yield line_num, ValueError(NOT_UTF8)
+                    continue
+                try:
+                    yield line_num, json.loads(line)
+                except ValueError as e:
+                    yield line_num, ValueError(f"Invalid JSON: {e}")
+
+
+def _validate(record, default_provider_id: Optional[UUID]) -> ShipmentCreate:
+    if isinstance(record, ValueError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Expected an object per line")
+    if default_provider_id and not record.get("provider_id"):
+        record["provider_id"] = default_provider_id
+    return ShipmentCreate.model_validate(record)
+
+
+def _format_error(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+    return str(e)
+
+
+def run_import_job(job_id: UUID, path: str, fmt: str, default_provider_id: Optional[UUID] = None):
+    """
+    Parse, validate and insert an uploaded file in fixed-size batches.
+
+    Each batch is inserted and the job's progress is updated in the same
+    transaction, so the counters always match what has been committed.
+    Invalid rows are recorded on the job and skipped.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        job.status = JobStatus.running
+        user_id = job.created_by
+        db.commit()
+
+        known_providers = set()
+        records = iter_records(path, fmt)
+
+        while True:
+            batch = list(islice(records, IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+
+            valid = []
+            errors = []
+            for line_num, record in batch:
+                try:
+                    valid.append((line_num, _validate(record, default_provider_id)))
+                except (ValidationError, ValueError) as e:
+                    errors.append({"line": line_num, "error": _format_error(e)})
+
+            # Resolve providers not seen in earlier batches with one query
+            unseen = {data.provider_id for _, data in valid} - known_providers
+            if unseen:
+                known_providers.update(
+                    provider_id for (provider_id,) in
+                    db.query(ShippingProvider.id).filter(ShippingProvider.id.in_(unseen))
+                )
+
+            rows = []
+            for line_num, data in valid:
+                if data.provider_id in known_providers:
+                    rows.append(build_shipment_row(data, user_id))
+                else:
+                    errors.append({"line": line_num, "error": f"Shipping provider not found: {data.provider_id}"})
+
+            if rows:
+                db.execute(insert(Shipment), rows)
+                db.execute(insert(StatusHistory), build_creation_events(rows))
+                record_created(db, rows)
+                touch_data_versions(db, [user_id])
+
+            job.rows_processed += len(batch)
+            job.rows_failed += len(errors)
+            if errors and len(job.errors) < MAX_REPORTED_ERRORS:
+                errors.sort(key=lambda err: err["line"])
+                job.errors = job.errors + errors[:MAX_REPORTED_ERRORS - len(job.errors)]
+            db.commit()
+            if rows:
+                invalidate_tracking(rows)
+                publish_created(user_id, rows)
+
+        job.status = JobStatus.completed
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        job = db.get(Job, job_id)
+        if job is not None:
+            job.status = JobStatus.failed
+            job.detail = str(e)
+            db.commit()
+        raise
+    finally:
+        db.close()
+        os.remove(path)
@@ -0,0 +1,85 @@
+# app/shipment/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import Row, Select, and_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.shipment import Shipment
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(created_at: datetime, shipment_id: UUID, rank: Optional[float] = None) -> str:
+    """Build an opaque cursor pointing just after the given shipment."""
+    key = [created_at.isoformat(), str(shipment_id)]
+    if rank is not None:
+        key.insert(0, rank)
+    payload = json.dumps(key)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ranked: bool = False) -> Tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(key, list):
+            raise ValueError("cursor payload is not a list")
+        rank = float(key.pop(0)) if ranked else None
+        created_at, shipment_id = key
+        return rank, datetime.fromisoformat(created_at), UUID(shipment_id)
+    except (ValueError, TypeError, AttributeError, IndexError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(
+    db: AsyncSession, query: Select, limit: int, cursor: Optional[str] = None, rank=None
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Keyset pagination over (created_at, id).
+
+    `query` selects whichever Shipment columns the caller needs; the page
+    comes back as result rows, with the sort key (cursor_created_at,
+    cursor_id and, if ranked, cursor_rank) appended after them.
+
+    Rows inserted while a client is paging sort after the cursor they were
+    given, so pages never skip or repeat rows and the cost of a page does
+    not depend on how deep into the result set it is. When a `rank`
+    expression is given, rows are ordered by it (highest first) and
+    (created_at, id) only breaks ties.
+    """
+    after_key = tuple_(Shipment.created_at, Shipment.id)
+    query = query.add_columns(Shipment.created_at.label("cursor_created_at"), Shipment.id.label("cursor_id"))
+
+    if rank is None:
+        if cursor:
+            _, created_at, shipment_id = decode_cursor(cursor)
+            query = query.where(after_key > (created_at, shipment_id))
+        query = query.order_by(Shipment.created_at, Shipment.id)
+    else:
+        query = query.add_columns(rank.label("cursor_rank"))
+        if cursor:
+            last_rank, created_at, shipment_id = decode_cursor(cursor, ranked=True)
+            query = query.where(or_(
+                rank < last_rank,
+                and_(rank == last_rank, after_key > (created_at, shipment_id)),
+            ))
+        query = query.order_by(rank.desc(), Shipment.created_at, Shipment.id)
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            last.cursor_created_at, last.cursor_id, last.cursor_rank if rank is not None else None
+        )
+    return rows, next_cursor
@@ -0,0 +1,166 @@
+# app/shipment/purge.py
+
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import delete, func, or_, select, tuple_, update
+
+from app.analytics.rollup import record_deleted
+from app.database import SessionLocal
+from app.models.job import Job, JobStatus
+from app.models.shipment import Shipment
+from app.models.status_history import StatusHistory
+from app.shipment.events import publish_deleted
+from app.shipment.versions import touch_data_versions
+from app.tracking.cache import invalidate_tracking
+
+PURGE_JOB_KIND = "shipment_purge"
+PURGE_BATCH_SIZE = 1000
+
+# A running job whose row hasn't been touched for this long lost its worker
+PURGE_STALE_AFTER = timedelta(minutes=5)
+PURGE_RETRY_DELAY_SECONDS = 0.1
+
+
+def purge_job_orphaned(job: Job) -> bool:
+    """True if the job is unfinished and no worker has touched it for PURGE_STALE_AFTER."""
+    return (
+        job.status in (JobStatus.pending, JobStatus.running)
+        and job.updated_at < datetime.utcnow() - PURGE_STALE_AFTER
+    )
+
+
+def claim_purge_job(db, job_id: UUID) -> bool:
+    """
+    Mark the job running if it is pending or its previous worker died.
+
+    A conditional UPDATE, so of several workers resuming the same job only
+    one wins.
+    """
+    claimed = db.execute(
+        update(Job)
+        .where(
+            Job.id == job_id,
+            or_(
+                Job.status == JobStatus.pending,
+                (Job.status == JobStatus.running) & (Job.updated_at < datetime.utcnow() - PURGE_STALE_AFTER),
+            ),
+        )
+        .values(status=JobStatus.running, updated_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def run_purge_job(job_id: UUID):
+    """
+    Delete a user's shipments, and their status history, in bounded batches.
+
+    Each batch is its own short transaction: it locks at most
+    PURGE_BATCH_SIZE shipment rows, updates the rollup and the job's
+    progress, and commits, so other writers never wait long and WAL is
+    written steadily rather than in one burst. Only shipments created before
+    the job are deleted, and progress is committed with each batch, so a job
+    interrupted by a crash picks up where it left off when resumed.
+    """
+    db = SessionLocal()
+    try:
+        if not claim_purge_job(db, job_id):
+            return
+        job = db.get(Job, job_id)
+        user_id = job.created_by
+
+        owned = (Shipment.created_by == user_id, Shipment.created_at <= job.created_at)
+        if job.rows_total is None:
+            job.rows_total = db.execute(select(func.count()).select_from(Shipment).where(*owned)).scalar()
+            db.commit()
+
+        # Walk the (created_by, created_at, id) index forward instead of
+        # rescanning from its start, past the dead entries of earlier batches
+        after = None
+        while True:
+            query = select(Shipment.id, Shipment.created_at).where(*owned)
+            if after is not None:
+                query = query.where(tuple_(Shipment.created_at, Shipment.id) > after)
+            keys = db.execute(
+                query
+                .order_by(Shipment.created_at, Shipment.id)
+                .limit(PURGE_BATCH_SIZE)
+                # Rows a concurrent PATCH is holding are left for the next sweep
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not keys:
+                if after is not None:
+                    after = None
+                    continue
+                if db.execute(select(Shipment.id).where(*owned).limit(1)).first() is None:
+                    break
+                # Everything left is locked by someone else right now
+                db.rollback()
+                time.sleep(PURGE_RETRY_DELAY_SECONDS)
+                continue
+            after = (keys[-1].created_at, keys[-1].id)
+            ids = [key.id for key in keys]
+
+            db.execute(delete(StatusHistory).where(StatusHistory.shipment_id.in_(ids)))
+            deleted = db.execute(
+                delete(Shipment)
+                .where(Shipment.id.in_(ids))
+                .returning(
+                    Shipment.id,
+                    Shipment.shipment_id,
+                    Shipment.tracking_id,
+                    Shipment.external_tracking_id,
+                    Shipment.created_by,
+                    Shipment.created_at,
+                    Shipment.status,
+                    Shipment.provider_id,
+                )
+            ).all()
+            record_deleted(db, deleted)
+            touch_data_versions(db, [user_id])
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(rows_processed=Job.rows_processed + len(deleted), updated_at=datetime.utcnow())
+            )
+            db.commit()
+
+            invalidate_tracking(deleted)
+            publish_deleted(user_id, deleted)
+
+        db.execute(update(Job).where(Job.id == job_id).values(status=JobStatus.completed))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        db.execute(update(Job).where(Job.id == job_id).values(status=JobStatus.failed, detail=str(e)))
+        db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def resume_purge_jobs():
+    """
+    Restart purges left pending or orphaned by a crashed worker.
+
+    Runs on startup; a job whose worker died too recently to look stale then
+    is taken over later by the delete-all routes (see purge_job_orphaned).
+    """
+    db = SessionLocal()
+    try:
+        job_ids = db.execute(
+            select(Job.id).where(
+                Job.kind == PURGE_JOB_KIND,
+                or_(
+                    Job.status == JobStatus.pending,
+                    (Job.status == JobStatus.running) & (Job.updated_at < datetime.utcnow() - PURGE_STALE_AFTER),
+                ),
+            )
+        ).scalars().all()
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        run_purge_job(job_id)
@@ -1,47 +1,88 @@
-from operator import or_
-
-from fastapi import APIRouter, Depends, HTTPException, Path, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, any_, bindparam, cast, delete, false, func, extract, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from uuid import uuid4, UUID
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 
-from app.database import SessionLocal
-from app.models.shipment import Shipment, ShipmentStatus
+from app.database import AsyncSessionLocal
+from app.models.shipment import Shipment, ShipmentStatus, shipment_search_vector
 from app.models.shipping_provider import ShippingProvider
 from app.models.user import User
-from app.schemas.shipment import ShipmentCreate, ShipmentResponse, ShipmentUpdate
+from app.models.job import Job, JobStatus
+from app.models.status_history import StatusHistory
+from app.schemas.shipment import (
+    BulkShipmentUpdate,
+    BulkUpdateResponse,
+    ShipmentCreate,
+    ShipmentPage,
+    ShipmentResponse,
+    ShipmentTimeline,
+    ShipmentUpdate,
+)
 from app.schemas.shipping_provider import ShippingProviderCreate, ShippingProviderResponse
 from app.schemas.analytics import ShipmentSummary
+from app.schemas.job import JobResponse
 from app.auth.dependencies import get_current_user
+from app.core.config import settings
+from app.analytics.rollup import record_created, record_deleted, record_status_change, record_status_changes
+from app.shipment.events import (
+    RESET,
+    publish_created,
+    publish_deleted,
+    publish_updated,
+    shipment_events,
+)
+from app.shipment.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from app.shipment.serialization import (
+    FIELDS_DESCRIPTION,
+    SHIPMENT_COLUMNS,
+    fast_json,
+    parse_fields,
+    shipment_columns,
+    shipment_rows,
+)
+from app.shipment.utils import build_creation_events, build_shipment_row, build_status_event, shipment_filters
+from app.shipment.versions import conditional_get, touch_data_versions
+from app.shipment.importer import IMPORT_FORMATS, IMPORT_JOB_KIND, run_import_job
+from app.shipment.purge import PURGE_JOB_KIND, purge_job_orphaned, run_purge_job
+from app.shipment.archive import CLOSED_STATUSES
+from app.tracking.cache import clear_tracking_cache, invalidate_tracking
 import csv
 import io
+import os
+import tempfile
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 # Routers
 shipment_router = APIRouter(tags=["Shipments"])
+
+INCLUDE_ARCHIVED_DESCRIPTION = (
+    "Also return archived shipments (delivered or cancelled, created more than "
+    "SHIPMENT_ARCHIVE_AFTER_DAYS ago); by default only the active partitions are read"
+)
 provider_router = APIRouter(tags=["Shipping Providers"])
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # ------------------------
 # 🚚 Shipment Endpoints
 # ------------------------
 
 @shipment_router.post("/create-shipments", response_model=ShipmentResponse)
-def create_shipment(
+async def create_shipment(
     shipment_data: ShipmentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    provider = db.query(ShippingProvider).filter(ShippingProvider.id == shipment_data.provider_id).first()
+    provider = (await db.execute(
+        select(ShippingProvider.id).where(ShippingProvider.id == shipment_data.provider_id)
+    )).first()
     if not provider:
         raise HTTPException(status_code=404, detail="Shipping provider not found")
 
@@ -60,129 +101,425 @@ def create_shipment(
         created_by=current_user.id
     )
     db.add(new_shipment)
-    db.commit()
-    db.refresh(new_shipment)
+    await db.flush()
+    await db.execute(
+        insert(StatusHistory),
+        [build_status_event(new_shipment.id, new_shipment.status, new_shipment.created_at)]
+    )
+    await db.run_sync(record_created, [new_shipment])
+    await db.run_sync(touch_data_versions, [current_user.id])
+    await db.commit()
+    invalidate_tracking([new_shipment])
+    publish_created(current_user.id, [new_shipment])
     return new_shipment
 
 
 @shipment_router.post("/bulk", response_model=List[ShipmentResponse], status_code=status.HTTP_201_CREATED)
-def create_bulk_shipments(
+async def create_bulk_shipments(
     shipment_list: List[ShipmentCreate],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    created_shipments = []
-
+    if not shipment_list:
+        return []
+
+    # Validate every distinct provider with a single query
+    provider_ids = {shipment_data.provider_id for shipment_data in shipment_list}
+    found_ids = {
+        provider_id for (provider_id,) in
+        await db.execute(select(ShippingProvider.id).where(ShippingProvider.id.in_(provider_ids)))
+    }
     for shipment_data in shipment_list:
-        provider = db.query(ShippingProvider).filter(
-            ShippingProvider.id == shipment_data.provider_id
-        ).first()
-
-        if not provider:
+        if shipment_data.provider_id not in found_ids:
             raise HTTPException(
                 status_code=404,
                 detail=f"Shipping provider not found: {shipment_data.provider_id}"
             )
 
-        new_shipment = Shipment(
-            shipment_id=uuid4(),
-            tracking_id=uuid4(),
-            origin=shipment_data.origin,
-            destination=shipment_data.destination,
-            status=shipment_data.status,
-            provider_id=shipment_data.provider_id,
-            estimated_delivery=shipment_data.estimated_delivery,
-            weight_kg=shipment_data.weight_kg,
-            dimensions=shipment_data.dimensions,
-            description=shipment_data.description,
-            external_tracking_id=shipment_data.external_tracking_id,  # ✅ ADDED
-            created_by=current_user.id
-        )
-        db.add(new_shipment)
-        created_shipments.append(new_shipment)
+    rows = [build_shipment_row(shipment_data, current_user.id) for shipment_data in shipment_list]
 
-    db.commit()
-    for shipment in created_shipments:
-        db.refresh(shipment)
+    # Multi-row INSERT ... RETURNING, batched by SQLAlchemy's insertmanyvalues
+    result = await db.execute(
+        insert(Shipment)
+        .returning(*SHIPMENT_COLUMNS, Shipment.created_by, sort_by_parameter_order=True),
+        rows,
+    )
+    created_shipments = result.all()
+    await db.execute(insert(StatusHistory), build_creation_events(rows))
+    await db.run_sync(record_created, created_shipments)
+    await db.run_sync(touch_data_versions, [current_user.id])
+    await db.commit()
+    invalidate_tracking(created_shipments)
+    publish_created(current_user.id, created_shipments)
 
-    return created_shipments
+    return fast_json(shipment_rows(created_shipments), status_code=status.HTTP_201_CREATED)
 
 
-@shipment_router.get("/list-shipments", response_model=List[ShipmentResponse])
-def list_user_shipments(
-    db: Session = Depends(get_db),
+@shipment_router.post("/import", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_shipments(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    provider_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return db.query(Shipment).filter(Shipment.created_by == current_user.id).all()
+    """
+    Upload a CSV or NDJSON file as the raw request body.
+
+    The body is spooled to disk as it arrives and imported by a background
+    job; poll GET /shipments/import/{job_id} for progress. `provider_id` is
+    used for rows that don't carry their own. Bodies over
+    SHIPMENT_IMPORT_MAX_BYTES get a 413.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported content type, expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+
+    max_bytes = settings.SHIPMENT_IMPORT_MAX_BYTES
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload larger than {max_bytes} bytes",
+    )
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+
+    with tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False) as upload:
+        try:
+            received = 0
+            async for chunk in request.stream():
+                # Chunked bodies declare no length up front
+                received += len(chunk)
+                if received > max_bytes:
+                    raise too_large
+                # Keep disk writes off the event loop
+                await run_in_threadpool(upload.write, chunk)
+        except Exception:
+            os.remove(upload.name)
+            raise
+
+    job = Job(kind=IMPORT_JOB_KIND, created_by=current_user.id)
+    db.add(job)
+    await db.commit()
+
+    background_tasks.add_task(run_import_job, job.id, upload.name, fmt, provider_id)
+    return job
+
+
+@shipment_router.get("/import/{job_id}", response_model=JobResponse)
+async def get_import_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    job = (await db.execute(select(Job).where(
+        Job.id == job_id,
+        Job.kind == IMPORT_JOB_KIND,
+        Job.created_by == current_user.id
+    ))).scalars().first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@shipment_router.get("/list-shipments", response_model=ShipmentPage, dependencies=[Depends(conditional_get)])
+async def list_user_shipments(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include_archived: bool = Query(False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    selected = parse_fields(fields)
+    query = select(*shipment_columns(selected)).where(Shipment.created_by == current_user.id)
+    if not include_archived:
+        query = query.where(Shipment.archived == false())
+    rows, next_cursor = await paginate(db, query, limit, cursor)
+    return fast_json({"items": shipment_rows(rows, selected), "next_cursor": next_cursor}, response)
 
 
-@shipment_router.get("/by-provider/{provider_id}", response_model=List[ShipmentResponse])
-def get_shipments_by_provider(
+@shipment_router.get("/by-provider/{provider_id}", response_model=List[ShipmentResponse], dependencies=[Depends(conditional_get)])
+async def get_shipments_by_provider(
     provider_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include_archived: bool = Query(False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    shipments = db.query(Shipment).filter(
+    selected = parse_fields(fields)
+    query = select(*shipment_columns(selected)).where(
         Shipment.provider_id == provider_id,
         Shipment.created_by == current_user.id
-    ).all()
+    )
+    if not include_archived:
+        query = query.where(Shipment.archived == false())
+    rows = (await db.execute(query)).all()
 
-    if not shipments:
+    if not rows:
         raise HTTPException(status_code=404, detail="No shipments found for this provider")
 
-    return shipments
+    return fast_json(shipment_rows(rows, selected), response)
 
 
-@shipment_router.get("/search", response_model=List[ShipmentResponse])
-def search_shipments(
+@shipment_router.get("/search", response_model=ShipmentPage, dependencies=[Depends(conditional_get)])
+async def search_shipments(
+    response: Response,
     origin: Optional[str] = None,
     destination: Optional[str] = None,
     status: Optional[str] = None,
     provider_id: Optional[UUID] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    q: Optional[str] = Query(None, description="Full-text search over origin, destination and description"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include_archived: bool = Query(False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Shipment).filter(Shipment.created_by == current_user.id)
-
-    if origin:
-        query = query.filter(Shipment.origin.ilike(f"%{origin}%"))
-    if destination:
-        query = query.filter(Shipment.destination.ilike(f"%{destination}%"))
-    if status:
-        query = query.filter(Shipment.status == status)
-    if provider_id:
-        query = query.filter(Shipment.provider_id == provider_id)
-    if date_from:
-        query = query.filter(Shipment.created_at >= date_from)
-    if date_to:
-        query = query.filter(Shipment.created_at <= date_to)
-
-    return query.all()
-
-
-@shipment_router.get("/{shipment_id}", response_model=ShipmentResponse)
-def get_shipment_by_id(
+    selected = parse_fields(fields)
+    query = select(*shipment_columns(selected)).where(Shipment.created_by == current_user.id)
+    if not include_archived:
+        query = query.where(Shipment.archived == false())
+    rank = None
+
+    if q:
+        ts_query = func.websearch_to_tsquery("simple", q)
+        query = query.filter(shipment_search_vector.op("@@")(ts_query))
+        rank = cast(func.ts_rank(shipment_search_vector, ts_query), Float)
+
+    query = query.filter(*shipment_filters(origin, destination, status, provider_id, date_from, date_to))
+
+    rows, next_cursor = await paginate(db, query, limit, cursor, rank)
+    return fast_json({"items": shipment_rows(rows, selected), "next_cursor": next_cursor}, response)
+
+
+@shipment_router.get("/events", response_class=StreamingResponse)
+async def stream_shipment_events(
+    current_user: User = Depends(get_current_user)
+):
+    """Server-sent events with the user's shipment changes (see app.shipment.events)."""
+    user_id = current_user.id
+    # Answered before the stream starts; the subscription itself is taken
+    # inside the generator so its finally always releases it, even when the
+    # client is gone before the body is first iterated
+    shipment_events.check_capacity(user_id)
+
+    async def events():
+        subscription = shipment_events.subscribe(user_id)
+        if subscription is None:
+            # Another stream took the last slot since the check
+            return
+        try:
+            # Reconnecting clients refetch before applying deltas again
+            yield f"retry: 3000\ndata: {RESET}\n\n"
+            while True:
+                message = await subscription.next(settings.SHIPMENT_EVENTS_HEARTBEAT_SECONDS)
+                # Comment lines keep proxies from timing out idle streams
+                yield ": ping\n\n" if message is None else f"data: {message}\n\n"
+        finally:
+            shipment_events.unsubscribe(user_id, subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+MAX_TIMELINE_SHIPMENTS = 100
+
+
+async def load_timelines(db: AsyncSession, user_id, shipment_ids: List[UUID]) -> List[dict]:
+    """
+    Status events of the given shipments (public or internal ids), oldest first.
+
+    Ownership is checked on the shipments side; events are then read per
+    shipment through ix_status_history_shipment_id_timestamp.
+    """
+    shipments = (await db.execute(
+        select(Shipment.id, Shipment.shipment_id).where(
+            or_(Shipment.shipment_id.in_(shipment_ids), Shipment.id.in_(shipment_ids)),
+            Shipment.created_by == user_id
+        )
+    )).all()
+
+    # Answer in the order the ids were asked for
+    position = {shipment_id: i for i, shipment_id in enumerate(shipment_ids)}
+    shipments = sorted(shipments, key=lambda row: min(
+        position.get(row.id, len(position)), position.get(row.shipment_id, len(position))
+    ))
+    timelines = {shipment_id: {"shipment_id": public_id, "events": []} for shipment_id, public_id in shipments}
+    if timelines:
+        events = await db.execute(
+            select(StatusHistory.shipment_id, StatusHistory.status, StatusHistory.timestamp)
+            .where(StatusHistory.shipment_id.in_(timelines))
+            .order_by(StatusHistory.shipment_id, StatusHistory.timestamp)
+        )
+        for shipment_id, event_status, timestamp in events:
+            timelines[shipment_id]["events"].append({"status": event_status, "timestamp": timestamp})
+
+    return list(timelines.values())
+
+
+@shipment_router.get("/timelines", response_model=List[ShipmentTimeline], dependencies=[Depends(conditional_get)])
+async def get_shipment_timelines(
+    ids: List[UUID] = Query(..., description="Shipment IDs, repeat the parameter for each"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if len(ids) > MAX_TIMELINE_SHIPMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_TIMELINE_SHIPMENTS} shipments per request"
+        )
+    return await load_timelines(db, current_user.id, ids)
+
+
+@shipment_router.get("/{shipment_id}/timeline", response_model=ShipmentTimeline, dependencies=[Depends(conditional_get)])
+async def get_shipment_timeline(
+    shipment_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    timelines = await load_timelines(db, current_user.id, [shipment_id])
+    if not timelines:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+    return timelines[0]
+
+
+@shipment_router.get("/{shipment_id}", response_model=ShipmentResponse, dependencies=[Depends(conditional_get)])
+async def get_shipment_by_id(
     shipment_id: str = Path(..., description="Public shipment ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    shipment = db.query(Shipment).filter(
+    shipment = (await db.execute(select(Shipment).where(
         Shipment.shipment_id == shipment_id,
         Shipment.created_by == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found")
     return shipment
 
 
+MAX_BULK_UPDATE_IDS = 50000
+
+
+@shipment_router.patch("/bulk-status", response_model=BulkUpdateResponse)
+async def bulk_update_shipments(
+    update_data: BulkShipmentUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if (update_data.ids is None) == (update_data.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+    if update_data.status is None and update_data.estimated_delivery is None:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    if update_data.ids is not None:
+        if len(update_data.ids) > MAX_BULK_UPDATE_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_UPDATE_IDS} ids per request")
+        # One array parameter rather than one bind per id: stays a single
+        # statement however large the batch (asyncpg caps binds at 32767)
+        ids = bindparam("ids", list(update_data.ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+        filters = [or_(Shipment.shipment_id == any_(ids), Shipment.id == any_(ids))]
+    else:
+        filters = shipment_filters(**update_data.filter.model_dump())
+        if not filters:
+            raise HTTPException(status_code=400, detail="Filter must set at least one field")
+
+    values = {}
+    changed = []
+    if update_data.status is not None:
+        values["status"] = update_data.status
+        if update_data.status not in CLOSED_STATUSES:
+            # Reopened shipments leave the archive
+            values["archived"] = false()
+        changed.append(Shipment.status.is_distinct_from(update_data.status))
+    if update_data.estimated_delivery is not None:
+        values["estimated_delivery"] = update_data.estimated_delivery
+        changed.append(Shipment.estimated_delivery.is_distinct_from(update_data.estimated_delivery))
+
+    # Lock every match, rewrite only rows that actually change, and report
+    # both in one round trip. One match past the cap tells a filter that
+    # matches too many apart, and nothing is rewritten then
+    matched = (
+        select(Shipment.id, Shipment.shipment_id, Shipment.status.label("old_status"))
+        .where(Shipment.created_by == current_user.id, *filters)
+        # Same lock order as the carrier event flusher, so the two can't deadlock
+        .order_by(Shipment.id)
+        .limit(MAX_BULK_UPDATE_IDS + 1)
+        .with_for_update()
+        .cte("matched")
+    )
+    within_cap = select(func.count()).select_from(matched).scalar_subquery() <= MAX_BULK_UPDATE_IDS
+    updated = (
+        update(Shipment)
+        .where(Shipment.id == matched.c.id, within_cap, or_(*changed))
+        .values(**values)
+        .returning(
+            Shipment.id,
+            Shipment.tracking_id,
+            Shipment.external_tracking_id,
+            Shipment.created_by,
+            Shipment.created_at,
+            Shipment.provider_id,
+            Shipment.status,
+            Shipment.estimated_delivery,
+            matched.c.old_status,
+        )
+        .cte("updated")
+    )
+    rows = (await db.execute(
+        select(matched.c.id, matched.c.shipment_id, *[c for c in updated.c if c.key != "id"])
+        .outerjoin(updated, updated.c.id == matched.c.id)
+    )).mappings().all()
+    if len(rows) > MAX_BULK_UPDATE_IDS:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Filter matches more than {MAX_BULK_UPDATE_IDS} shipments")
+
+    changed_rows = [row for row in rows if row["created_by"] is not None]
+    status_changes = [row for row in changed_rows if row["status"] != row["old_status"]]
+    if status_changes:
+        await db.run_sync(record_status_changes, status_changes)
+        await db.execute(insert(StatusHistory), [build_status_event(row["id"], row["status"]) for row in status_changes])
+    if changed_rows:
+        await db.run_sync(touch_data_versions, [current_user.id])
+    await db.commit()
+
+    if changed_rows:
+        invalidate_tracking(changed_rows)
+        publish_updated(current_user.id, changed_rows)
+
+    outcome = {}
+    for row in rows:
+        result = "updated" if row["created_by"] is not None else "unchanged"
+        outcome[row["id"]] = outcome[row["shipment_id"]] = result
+
+    if update_data.ids is not None:
+        results = [{"id": id, "result": outcome.get(id, "not_found")} for id in update_data.ids]
+    else:
+        results = [{"id": row["shipment_id"], "result": outcome[row["id"]]} for row in rows]
+
+    return {"matched": len(rows), "updated": len(changed_rows), "results": results}
+
+
 @shipment_router.patch("/{shipment_id}", response_model=ShipmentResponse)
-def update_shipment_status_or_delivery(
+async def update_shipment_status_or_delivery(
     shipment_id: str,
     update_data: ShipmentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
@@ -190,41 +527,99 @@ def update_shipment_status_or_delivery(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid shipment id")
 
-    shipment = db.query(Shipment).filter(
+    shipment = (await db.execute(select(Shipment).where(
         or_(
             Shipment.shipment_id == shipment_uuid,
             Shipment.id == shipment_uuid
         ),
         Shipment.created_by == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found")
 
-    if update_data.status is not None:
+    old_status = shipment.status
+    if update_data.status is not None and update_data.status != shipment.status:
         shipment.status = update_data.status
+        if shipment.status not in CLOSED_STATUSES:
+            # Reopened: back among the active shipments the lists show
+            shipment.archived = False
+        await db.run_sync(record_status_change, shipment, old_status)
+        await db.execute(insert(StatusHistory), [build_status_event(shipment.id, shipment.status)])
 
     if update_data.estimated_delivery is not None:
         shipment.estimated_delivery = update_data.estimated_delivery
 
-    db.commit()
-    db.refresh(shipment)
+    await db.run_sync(touch_data_versions, [current_user.id])
+    await db.commit()
+    invalidate_tracking([shipment])
+    publish_updated(current_user.id, [{
+        "id": shipment.id,
+        "shipment_id": shipment.shipment_id,
+        "status": shipment.status,
+        "old_status": old_status,
+        "estimated_delivery": shipment.estimated_delivery,
+    }])
 
     return shipment
 
-@shipment_router.delete("/delete-all", status_code=status.HTTP_204_NO_CONTENT)
-def delete_all_shipments(
-    db: Session = Depends(get_db),
+@shipment_router.delete("/delete-all", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def delete_all_shipments(
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db.query(Shipment).filter(Shipment.created_by == current_user.id).delete()
-    db.commit()
+    """
+    Delete every shipment of the current user in a background job.
+
+    Shipments are removed in batches; poll GET /shipments/delete-all/{job_id}
+    for progress. A purge already in progress is returned instead of
+    starting another, and resumed if its worker has died.
+    """
+    job = (await db.execute(select(Job).where(
+        Job.kind == PURGE_JOB_KIND,
+        Job.created_by == current_user.id,
+        Job.status.in_([JobStatus.pending, JobStatus.running])
+    ))).scalars().first()
+    if job:
+        if purge_job_orphaned(job):
+            # run_purge_job claims it conditionally, so a live worker keeps it
+            background_tasks.add_task(run_purge_job, job.id)
+        return job
+
+    job = Job(kind=PURGE_JOB_KIND, created_by=current_user.id)
+    db.add(job)
+    await db.commit()
+
+    background_tasks.add_task(run_purge_job, job.id)
+    return job
+
+
+@shipment_router.get("/delete-all/{job_id}", response_model=JobResponse)
+async def get_purge_job(
+    job_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    job = (await db.execute(select(Job).where(
+        Job.id == job_id,
+        Job.kind == PURGE_JOB_KIND,
+        Job.created_by == current_user.id
+    ))).scalars().first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Delete job not found")
+    if purge_job_orphaned(job):
+        # Polling picks up a purge whose worker died after startup
+        background_tasks.add_task(run_purge_job, job.id)
+    return job
 
 
 @shipment_router.delete("/{shipment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_shipment(
+async def delete_shipment(
     shipment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
@@ -232,19 +627,24 @@ def delete_shipment(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid shipment id")
 
-    shipment = db.query(Shipment).filter(
+    shipment = (await db.execute(select(Shipment).where(
         or_(
             Shipment.shipment_id == shipment_uuid,
             Shipment.id == shipment_uuid
         ),
         Shipment.created_by == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found")
 
-    db.delete(shipment)
-    db.commit()
+    await db.run_sync(record_deleted, [shipment])
+    await db.execute(delete(StatusHistory).where(StatusHistory.shipment_id == shipment.id))
+    await db.delete(shipment)
+    await db.run_sync(touch_data_versions, [current_user.id])
+    await db.commit()
+    invalidate_tracking([shipment])
+    publish_deleted(current_user.id, [shipment])
 
 
 
@@ -255,12 +655,14 @@ def delete_shipment(
 # -------------------------------
 
 @provider_router.post("/create-provider", response_model=ShippingProviderResponse)
-def create_provider(
+async def create_provider(
     data: ShippingProviderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    existing = db.query(ShippingProvider).filter_by(name=data.name).first()
+    existing = (await db.execute(
+        select(ShippingProvider.id).filter_by(name=data.name)
+    )).first()
     if existing:
         raise HTTPException(status_code=400, detail="Provider already exists")
 
@@ -273,51 +675,53 @@ def create_provider(
         created_by=current_user.id
     )
     db.add(provider)
-    db.commit()
-    db.refresh(provider)
+    await db.run_sync(touch_data_versions, [current_user.id])
+    await db.commit()
     return provider
 
 
-@provider_router.get("/list-provider", response_model=List[ShippingProviderResponse])
-def list_providers(
-    db: Session = Depends(get_db),
+@provider_router.get("/list-provider", response_model=List[ShippingProviderResponse], dependencies=[Depends(conditional_get)])
+async def list_providers(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return db.query(ShippingProvider).filter(
+    return (await db.execute(select(ShippingProvider).where(
         ShippingProvider.created_by == current_user.id
-    ).all()
+    ))).scalars().all()
 
 
 @provider_router.delete("/delete-provider/{provider_id}", status_code=204)
-def delete_provider(
+async def delete_provider(
     provider_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    provider = db.query(ShippingProvider).filter_by(
+    provider = (await db.execute(select(ShippingProvider).filter_by(
         id=provider_id,
         created_by=current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
-    db.delete(provider)
-    db.commit()
+    await db.delete(provider)
+    await db.run_sync(touch_data_versions, [current_user.id])
+    await db.commit()
+    clear_tracking_cache()
     return
 
 
 @provider_router.patch("/patch-provider/{provider_id}", response_model=ShippingProviderResponse)
-def update_provider(
+async def update_provider(
     provider_id: UUID,
     data: ShippingProviderCreate,  # Reusing the same schema for update
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    provider = db.query(ShippingProvider).filter_by(
+    provider = (await db.execute(select(ShippingProvider).filter_by(
         id=provider_id,
         created_by=current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
@@ -328,8 +732,13 @@ def update_provider(
     provider.contact_email = data.contact_email
     provider.phone = data.phone
 
-    db.commit()
-    db.refresh(provider)
+    # Shipment and analytics responses of everyone shipping with it show its name
+    owners = (await db.execute(
+        select(Shipment.created_by).where(Shipment.provider_id == provider_id).distinct()
+    )).scalars().all()
+    await db.run_sync(touch_data_versions, {current_user.id, *owners})
+    await db.commit()
+    clear_tracking_cache()
     return provider
 
 
@@ -337,89 +746,90 @@ def update_provider(
 # 📦 CSV Exports
 # ------------------------
 
+EXPORT_CHUNK_SIZE = 1000
+
+CSV_HEADER = [
+    "Shipment ID", "Tracking ID", "External Tracking ID", "Origin", "Destination", "Status",
+    "Estimated Delivery", "Weight (kg)", "Dimensions", "Description", "Provider ID"
+]
+
+CSV_COLUMNS = (
+    Shipment.shipment_id,
+    Shipment.tracking_id,
+    Shipment.external_tracking_id,
+    Shipment.origin,
+    Shipment.destination,
+    Shipment.status,
+    Shipment.estimated_delivery,
+    Shipment.weight_kg,
+    Shipment.dimensions,
+    Shipment.description,
+    Shipment.provider_id,
+)
+
+
+async def stream_shipments_csv(*filters):
+    """
+    Yield CSV bytes chunk by chunk from a server-side cursor.
+
+    The generator opens its own session because the request-scoped one is
+    closed before the response body starts streaming.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_HEADER)
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate(0)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            select(*CSV_COLUMNS)
+            .where(*filters)
+            .order_by(Shipment.created_at, Shipment.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for rows in result.partitions():
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+
 @shipment_router.get("/export/csv", response_class=StreamingResponse)
-def export_all_shipments_to_csv(
-    db: Session = Depends(get_db),
+async def export_all_shipments_to_csv(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    shipments = db.query(Shipment).filter(Shipment.created_by == current_user.id).all()
+    filters = (Shipment.created_by == current_user.id,)
 
-    if not shipments:
+    if (await db.execute(select(Shipment.id).where(*filters).limit(1))).first() is None:
         raise HTTPException(status_code=404, detail="No shipments found to export.")
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Header row
-    writer.writerow([
-        "Shipment ID", "Tracking ID", "External Tracking ID", "Origin", "Destination", "Status",
-        "Estimated Delivery", "Weight (kg)", "Dimensions", "Description", "Provider ID"
-    ])
-
-    # Data rows
-    for s in shipments:
-        writer.writerow([
-            s.shipment_id,
-            s.tracking_id,
-            s.external_tracking_id,
-            s.origin,
-            s.destination,
-            s.status,
-            s.estimated_delivery,
-            s.weight_kg,
-            s.dimensions,
-            s.description,
-            s.provider_id
-        ])
-
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        stream_shipments_csv(*filters),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=all_shipments.csv"}
     )
 
 
 @shipment_router.get("/export/csv/by-provider/{provider_id}", response_class=StreamingResponse)
-def export_shipments_by_provider_to_csv(
+async def export_shipments_by_provider_to_csv(
     provider_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    shipments = db.query(Shipment).filter(
+    filters = (
         Shipment.created_by == current_user.id,
-        Shipment.provider_id == provider_id
-    ).all()
+        Shipment.provider_id == provider_id,
+    )
 
-    if not shipments:
+    if (await db.execute(select(Shipment.id).where(*filters).limit(1))).first() is None:
         raise HTTPException(status_code=404, detail="No shipments found for this provider.")
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow([
-        "Shipment ID", "Tracking ID", "External Tracking ID", "Origin", "Destination", "Status",
-        "Estimated Delivery", "Weight (kg)", "Dimensions", "Description", "Provider ID"
-    ])
-
-    for s in shipments:
-        writer.writerow([
-            s.shipment_id,
-            s.tracking_id,
-            s.external_tracking_id,
-            s.origin,
-            s.destination,
-            s.status,
-            s.estimated_delivery,
-            s.weight_kg,
-            s.dimensions,
-            s.description,
-            s.provider_id
-        ])
-
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        stream_shipments_csv(*filters),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=shipments_provider_{provider_id}.csv"}
     )
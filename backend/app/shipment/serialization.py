@@ -0,0 +1,77 @@
+# app/shipment/serialization.py
+
+"""
+Fast path for large shipment responses.
+
+Routes that can return thousands of shipments select exactly the
+ShipmentResponse columns as plain tuples, turn them into dicts here and
+encode them with orjson, bypassing ORM object construction and
+response_model validation. The declared response_model still documents
+the full shape in OpenAPI; shipment_rows() must keep producing exactly
+what validating through ShipmentResponse would. A `fields=` selection
+narrows both the SELECT list and the payload to the named fields.
+"""
+
+from typing import Any, Iterable, List, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+
+from app.models.shipment import Shipment
+from app.schemas.shipment import ShipmentResponse
+
+SHIPMENT_FIELDS = tuple(ShipmentResponse.model_fields)
+
+# select(*SHIPMENT_COLUMNS) yields rows in SHIPMENT_FIELDS order; extra
+# trailing columns (a cursor key, created_by, ...) are ignored below
+SHIPMENT_COLUMNS = tuple(getattr(Shipment, field) for field in SHIPMENT_FIELDS)
+
+FIELDS_DESCRIPTION = (
+    "Comma-separated subset of response fields to return, e.g. "
+    "`fields=shipment_id,status,estimated_delivery`; all fields when omitted"
+)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validated `fields=` selection, in canonical order; every field if unset."""
+    if fields is None:
+        return SHIPMENT_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(SHIPMENT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise HTTPException(status_code=400, detail="fields must name at least one field")
+    return tuple(field for field in SHIPMENT_FIELDS if field in requested)
+
+
+def shipment_columns(fields: Tuple[str, ...] = SHIPMENT_FIELDS) -> tuple:
+    return tuple(getattr(Shipment, field) for field in fields)
+
+
+def shipment_rows(rows: Iterable, fields: Tuple[str, ...] = SHIPMENT_FIELDS) -> List[dict]:
+    """Response dicts from rows whose leading values follow `fields`."""
+    items = []
+    convert_eta = "estimated_delivery" in fields
+    for row in rows:
+        item = dict(zip(fields, row))
+        if convert_eta:
+            # Stored as a timestamp, declared as a date
+            eta = item["estimated_delivery"]
+            if eta is not None:
+                item["estimated_delivery"] = eta.date()
+        items.append(item)
+    return items
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        # asyncpg hands back its own UUID subclass, which orjson won't take natively
+        return orjson.dumps(content, default=str)
+
+
+def fast_json(content, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """orjson-encode trusted data, keeping headers set by dependencies (ETag)."""
+    headers = response.headers if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
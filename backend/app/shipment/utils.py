@@ -0,0 +1,68 @@
+# app/shipment/utils.py
+
+from datetime import datetime
+from typing import Iterable, List, Mapping, Optional
+from uuid import UUID, uuid4
+
+from app.models.shipment import Shipment
+from app.schemas.shipment import ShipmentCreate
+
+
+def build_shipment_row(shipment_data: ShipmentCreate, created_by: UUID) -> dict:
+    """Column values for inserting a new shipment with Core insert()."""
+    return {
+        "id": uuid4(),
+        "shipment_id": uuid4(),
+        "tracking_id": uuid4(),
+        "origin": shipment_data.origin,
+        "destination": shipment_data.destination,
+        "status": shipment_data.status,
+        "provider_id": shipment_data.provider_id,
+        "estimated_delivery": shipment_data.estimated_delivery,
+        "weight_kg": shipment_data.weight_kg,
+        "dimensions": shipment_data.dimensions,
+        "description": shipment_data.description,
+        "external_tracking_id": shipment_data.external_tracking_id,
+        "created_by": created_by,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def build_status_event(shipment_id: UUID, status, timestamp: Optional[datetime] = None) -> dict:
+    """Column values for one status_history row."""
+    return {
+        "id": uuid4(),
+        "shipment_id": shipment_id,
+        "status": status,
+        "timestamp": timestamp or datetime.utcnow(),
+    }
+
+
+def build_creation_events(rows: Iterable[Mapping]) -> List[dict]:
+    """Initial status event for each newly inserted shipment row."""
+    return [build_status_event(row["id"], row["status"], row["created_at"]) for row in rows]
+
+
+def shipment_filters(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    status=None,
+    provider_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> list:
+    """WHERE clauses shared by search and bulk updates; unset arguments are skipped."""
+    filters = []
+    if origin:
+        filters.append(Shipment.origin.ilike(f"%{origin}%"))
+    if destination:
+        filters.append(Shipment.destination.ilike(f"%{destination}%"))
+    if status:
+        filters.append(Shipment.status == status)
+    if provider_id:
+        filters.append(Shipment.provider_id == provider_id)
+    if date_from:
+        filters.append(Shipment.created_at >= date_from)
+    if date_to:
+        filters.append(Shipment.created_at <= date_to)
+    return filters
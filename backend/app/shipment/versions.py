@@ -0,0 +1,109 @@
+# app/shipment/versions.py
+
+"""
+Per-user data versions and conditional GETs.
+
+users.data_version is incremented, in the same transaction, by every write
+that changes what a user's shipment, provider or analytics responses would
+contain. It is shared by all workers and survives restarts, so it can back
+ETags: GET routes guarded by conditional_get answer a matching
+If-None-Match with 304 after a single primary-key lookup, before any rows
+are loaded or serialized. The analytics response cache is keyed on the
+same version, so a body is only ever cached under the ETag it belongs to.
+Responses that also depend on something besides the data, like the
+current year, use conditional_get_scoped to fold it into the ETag.
+"""
+
+import hashlib
+from typing import Callable, Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_user
+from app.database import AsyncSessionLocal
+from app.models.user import User
+
+
+def touch_data_versions(db: Session, user_ids: Iterable):
+    """Bump data_version for the given users; call just before commit."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    if len(user_ids) == 1:
+        db.execute(update(User).where(User.id == user_ids[0]).values(data_version=User.data_version + 1))
+        return
+    # Lock in id order so concurrent multi-user writers can't deadlock
+    locked = (
+        select(User.id)
+        .where(User.id == bindparam("ids", user_ids, type_=ARRAY(PG_UUID(as_uuid=True))).any_())
+        .order_by(User.id)
+        .with_for_update(key_share=True)
+        .subquery()
+    )
+    db.execute(update(User).where(User.id == locked.c.id).values(data_version=User.data_version + 1))
+
+
+def make_etag(user_id, version: int, request: Request, scope=None) -> str:
+    """Weak ETag for one user's view of one URL at one data version (and scope)."""
+    key = f"{user_id}:{version}:{scope}:{request.url.path}?{request.url.query}"
+    return 'W/"%s"' % hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+async def check_not_modified(request: Request, response: Response, user: User, scope=None) -> int:
+    # Own short-lived session, returned to the pool before the route's opens
+    async with AsyncSessionLocal() as db:
+        version = (await db.execute(
+            select(User.data_version).where(User.id == user.id)
+        )).scalar_one()
+
+    etag = make_etag(user.id, version, request, scope)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return version
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Route dependency: 304 when the client's copy is current, else set ETag.
+
+    Returns the data version the ETag was built from, for caches that must
+    agree with it.
+    """
+    return await check_not_modified(request, response, current_user)
+
+
+def conditional_get_scoped(scope_dependency: Callable):
+    """
+    conditional_get whose ETag also covers the value of scope_dependency.
+
+    FastAPI resolves a dependency once per request, so a route that takes
+    Depends(scope_dependency) too gets the same value the ETag was built on.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        scope=Depends(scope_dependency),
+        current_user: User = Depends(get_current_user),
+    ):
+        return await check_not_modified(request, response, current_user, scope)
+
+    return dependency
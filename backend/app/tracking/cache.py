@@ -0,0 +1,36 @@
+# app/tracking/cache.py
+
+"""
+In-process cache for public tracking lookups, keyed by the reference the
+client asked for (tracking_id or external_tracking_id).
+
+Shipment writes call invalidate_tracking() after they commit, and
+provider writes clear the whole cache since one provider appears in many
+entries. Misses are not cached. Entries are per process; other workers
+see a change once their copy expires (TRACKING_CACHE_TTL_SECONDS).
+"""
+
+from collections.abc import Mapping
+from typing import Iterable
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+tracking_cache = TTLCache(
+    max_entries=settings.TRACKING_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TRACKING_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_tracking(shipments: Iterable):
+    """Drop cached lookups for shipments (ORM objects or column mappings)."""
+    for shipment in shipments:
+        if not isinstance(shipment, Mapping):
+            shipment = {key: getattr(shipment, key) for key in ("tracking_id", "external_tracking_id")}
+        tracking_cache.pop(str(shipment["tracking_id"]))
+        if shipment["external_tracking_id"]:
+            tracking_cache.pop(shipment["external_tracking_id"])
+
+
+def clear_tracking_cache():
+    tracking_cache.clear()
@@ -0,0 +1,223 @@
+# app/tracking/ingest.py
+
+"""
+Carrier status events, queued in memory and applied in batches.
+
+POST /track/events only validates and appends to the queue, so carriers
+never wait on the database. A single background task drains the queue
+every CARRIER_EVENT_FLUSH_INTERVAL_SECONDS (or as soon as a full batch is
+waiting) and applies each batch with one set-based UPDATE:
+
+- within a batch, only the newest event per external_tracking_id is kept;
+- an event is applied only if it is newer than the shipment's
+  carrier_event_at, so late and repeated deliveries are dropped.
+
+Status changes get the usual status_history rows, rollup deltas, data
+version bump and tracking cache invalidation. The queue is per process
+and not persisted: events still queued when a worker dies are lost, and
+carriers are expected to resend.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from datetime import timezone
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Text, and_, bindparam, cast, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, TIMESTAMP
+
+from app.analytics.rollup import record_status_changes
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.shipment import Shipment
+from app.models.status_history import StatusHistory
+from app.schemas.tracking import CarrierEvent
+from app.shipment.archive import CLOSED_STATUSES
+from app.shipment.events import publish_updated
+from app.shipment.utils import build_status_event
+from app.shipment.versions import touch_data_versions
+from app.tracking.cache import invalidate_tracking
+
+logger = logging.getLogger(__name__)
+
+
+def latest_events(events: Iterable[CarrierEvent]) -> dict:
+    """Newest (timestamp, status) per external_tracking_id; ties keep the first."""
+    latest = {}
+    for event in events:
+        timestamp = event.timestamp
+        if timestamp.tzinfo is not None:
+            # Stored timestamps are naive UTC
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        current = latest.get(event.external_tracking_id)
+        if current is None or timestamp > current[0]:
+            latest[event.external_tracking_id] = (timestamp, event.status)
+    return latest
+
+
+async def apply_carrier_events(events: List[CarrierEvent]) -> int:
+    """Apply one batch in a single transaction; returns the shipments updated."""
+    latest = latest_events(events)
+    if not latest:
+        return 0
+
+    batch = (
+        func.unnest(
+            bindparam("external_tracking_ids", list(latest), type_=ARRAY(Text)),
+            bindparam("timestamps", [timestamp for timestamp, _ in latest.values()], type_=ARRAY(TIMESTAMP)),
+            bindparam("statuses", [event_status.value for _, event_status in latest.values()], type_=ARRAY(Text)),
+        )
+        .table_valued("external_tracking_id", "timestamp", "status")
+        .render_derived(name="batch", with_types=False)
+    )
+    matched = (
+        select(
+            Shipment.id,
+            Shipment.status.label("old_status"),
+            cast(batch.c.status, Shipment.status.type).label("new_status"),
+            batch.c.timestamp,
+        )
+        .join(batch, Shipment.external_tracking_id == batch.c.external_tracking_id)
+        .where(or_(Shipment.carrier_event_at == None, Shipment.carrier_event_at < batch.c.timestamp))
+        # Fixed lock order, so concurrent bulk writers can't deadlock with us
+        .order_by(Shipment.id)
+        .with_for_update(of=Shipment)
+        .cte("matched")
+    )
+    stmt = (
+        update(Shipment)
+        .where(Shipment.id == matched.c.id)
+        .values(
+            status=matched.c.new_status,
+            carrier_event_at=matched.c.timestamp,
+            # A reopened shipment leaves the archive
+            archived=and_(Shipment.archived, matched.c.new_status.in_(CLOSED_STATUSES)),
+        )
+        .returning(
+            Shipment.id,
+            Shipment.shipment_id,
+            Shipment.tracking_id,
+            Shipment.external_tracking_id,
+            Shipment.created_by,
+            Shipment.created_at,
+            Shipment.provider_id,
+            Shipment.status,
+            matched.c.old_status,
+            matched.c.timestamp,
+        )
+    )
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(stmt)).mappings().all()
+        changes = [row for row in rows if row["status"] != row["old_status"]]
+        by_user = defaultdict(list)
+        for row in changes:
+            by_user[row["created_by"]].append(row)
+        if changes:
+            await db.run_sync(record_status_changes, changes)
+            await db.execute(
+                insert(StatusHistory),
+                [build_status_event(row["id"], row["status"], row["timestamp"]) for row in changes],
+            )
+            await db.run_sync(touch_data_versions, by_user)
+        await db.commit()
+
+    for user_id, user_changes in by_user.items():
+        publish_updated(user_id, user_changes)
+    invalidate_tracking(rows)
+    return len(rows)
+
+
+class CarrierEventQueue:
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._events = deque()
+        self._full_batch = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.applied = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+
+    def put(self, events: List[CarrierEvent]):
+        """Queue a request's events, all or nothing."""
+        if len(self._events) + len(events) > self.max_size:
+            self.rejected += len(events)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Event queue is full, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self._events.extend(events)
+        self.accepted += len(events)
+        if len(self._events) >= self.batch_size:
+            self._full_batch.set()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher once whatever is still queued has been written."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._full_batch.set()
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._full_batch.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full_batch.clear()
+            await self.flush()
+
+    async def flush(self):
+        while self._events:
+            count = min(len(self._events), self.batch_size)
+            batch = [self._events.popleft() for _ in range(count)]
+            start = time.perf_counter()
+            try:
+                self.applied += await apply_carrier_events(batch)
+            except Exception:
+                # Dropping the batch beats retrying it forever; carriers resend
+                self.failed += count
+                logger.exception("Failed to apply %d carrier events", count)
+            else:
+                self.flushed += count
+            self.batches += 1
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._events),
+            "max_size": self.max_size,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            # Shipments actually updated; the rest were stale, duplicate or unknown
+            "applied": self.applied,
+            "batches": self.batches,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+        }
+
+
+carrier_events = CarrierEventQueue(
+    max_size=settings.CARRIER_EVENT_QUEUE_MAX,
+    batch_size=settings.CARRIER_EVENT_BATCH_SIZE,
+    flush_interval=settings.CARRIER_EVENT_FLUSH_INTERVAL_SECONDS,
+)
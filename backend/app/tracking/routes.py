@@ -0,0 +1,105 @@
+# app/tracking/routes.py
+
+import hmac
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Request, status
+from sqlalchemy import func, or_, select
+from uuid import UUID
+
+from app.core.cache import MISSING
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter
+from app.database import AsyncSessionLocal
+from app.models.shipment import Shipment
+from app.models.shipping_provider import ShippingProvider
+from app.schemas.tracking import CarrierEvent, CarrierEventsAccepted, TrackingResponse
+from app.tracking.cache import tracking_cache
+from app.tracking.ingest import carrier_events
+
+router = APIRouter(tags=["Tracking"])
+
+tracking_rate_limiter = RateLimiter(
+    rate_per_minute=settings.TRACKING_RATE_LIMIT_PER_MINUTE,
+    burst=settings.TRACKING_RATE_LIMIT_BURST,
+)
+
+
+def rate_limit(request: Request):
+    client = request.client.host if request.client else "unknown"
+    if not tracking_rate_limiter.allow(client):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many tracking requests",
+            headers={"Retry-After": str(tracking_rate_limiter.retry_after())},
+        )
+
+
+def require_carrier_key(x_carrier_key: Optional[str] = Header(None)):
+    expected = settings.CARRIER_INGEST_API_KEY
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_carrier_key or not hmac.compare_digest(x_carrier_key, expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid carrier key")
+
+
+def normalize_reference(reference: str) -> str:
+    """Canonical form of UUID references, so cache keys match invalidation."""
+    try:
+        return str(UUID(reference))
+    except ValueError:
+        return reference
+
+
+async def lookup_tracking(reference: str):
+    """Public projection of the shipment a tracking reference points to."""
+    match = Shipment.external_tracking_id == reference
+    try:
+        match = or_(Shipment.tracking_id == UUID(reference), match)
+    except ValueError:
+        pass
+
+    # external_tracking_id is not unique across accounts; the newest wins
+    query = (
+        select(
+            Shipment.tracking_id,
+            Shipment.status,
+            Shipment.estimated_delivery,
+            func.coalesce(ShippingProvider.display_name, ShippingProvider.name).label("provider_name"),
+            ShippingProvider.tracking_url,
+        )
+        .outerjoin(ShippingProvider, Shipment.provider_id == ShippingProvider.id)
+        .where(match)
+        .order_by(Shipment.created_at.desc())
+        .limit(1)
+    )
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(query)).mappings().first()
+    return dict(row) if row else None
+
+
+@router.post(
+    "/events",
+    response_model=CarrierEventsAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_carrier_key)],
+)
+async def ingest_carrier_events(events: List[CarrierEvent]):
+    """Queue carrier status events; they are applied in the background."""
+    carrier_events.put(events)
+    return {"accepted": len(events)}
+
+
+@router.get("/{reference}", response_model=TrackingResponse, dependencies=[Depends(rate_limit)])
+async def track_shipment(
+    reference: str = Path(..., max_length=128, description="tracking_id or external tracking ID"),
+):
+    """Unauthenticated tracking lookup; served from memory for hot shipments."""
+    key = normalize_reference(reference)
+    result = tracking_cache.get(key)
+    if result is MISSING:
+        result = await lookup_tracking(key)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Shipment not found")
+        tracking_cache.set(key, result)
+    return result
@@ -0,0 +1,103 @@
+# scripts/bench_login_storm.py
+
+"""
+Login storm: sign-in throughput, and the latency of other endpoints meanwhile.
+
+Registers a throwaway user on a running server, then sends --logins
+logins, --concurrency at a time, while a cheap authenticated GET is
+probed every 20 ms. With --retry, logins answered 503 are retried after
+their Retry-After, to time how long the whole storm takes to get through.
+From backend/, with the app already serving:
+
+    uvicorn app.main:app --port 8000 &
+    python -m scripts.bench_login_storm [--url http://localhost:8000] [--logins 200] [--concurrency 100] [--retry]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+PROBE_PATH = "/shipments/list-shipments?limit=1"
+PROBE_INTERVAL_SECONDS = 0.02
+
+
+async def login(client: httpx.AsyncClient, credentials: dict, retry: bool) -> str:
+    while True:
+        try:
+            response = await client.post("/auth/login", json=credentials)
+        except httpx.HTTPError as e:
+            return type(e).__name__
+        if response.status_code == 503 and retry:
+            await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+            continue
+        return str(response.status_code)
+
+
+async def probe(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get(PROBE_PATH, headers=headers)
+            latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(url: str, logins: int, concurrency: int, retry: bool):
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        credentials = {"email": f"storm-{uuid.uuid4().hex}@example.com", "password": "password"}
+        (await client.post("/auth/register", json=credentials)).raise_for_status()
+        token = (await client.post("/auth/login", json=credentials)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        latencies = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, headers, stop, latencies))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            async with semaphore:
+                return await login(client, credentials, retry)
+
+        start = time.perf_counter()
+        outcomes = Counter(await asyncio.gather(*(one_login() for _ in range(logins))))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+        health = (await client.get("/health/password-hashing")).json()
+
+    print(f"logins: {dict(outcomes)} in {elapsed:.1f}s ({outcomes['200'] / elapsed:.1f} successful/s)")
+    if latencies:
+        print(
+            f"probe {PROBE_PATH}: {len(latencies)} requests, "
+            f"p50 {statistics.median(latencies) * 1000:.0f}ms, p99 {percentile(latencies, 0.99) * 1000:.0f}ms"
+        )
+    print(f"hash pool: {health}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logins under load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--retry", action="store_true", help="retry 503s after Retry-After")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.logins, args.concurrency, args.retry))
+
+
+if __name__ == "__main__":
+    main()
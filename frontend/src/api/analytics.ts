@@ -1,4 +1,4 @@
-import { getAccessToken } from "./auth";
+import { getAccessToken, refreshAccessToken } from "./auth";
 
 const BASE_URL = "http://localhost:8000/analytics";
 
@@ -12,12 +12,20 @@ const fetchWithAuth = async (endpoint: string) => {
     throw new Error("Unauthorized: No token found.");
   }
 
-  const res = await fetch(`${BASE_URL}${endpoint}`, {
-    headers: {
-      Authorization: `Bearer ${token}`,
-      "Content-Type": "application/json",
-    },
-  });
+  const request = (accessToken: string) =>
+    fetch(`${BASE_URL}${endpoint}`, {
+      headers: {
+        Authorization: `Bearer ${accessToken}`,
+        "Content-Type": "application/json",
+      },
+    });
+
+  let res = await request(token);
+  if (res.status === 401) {
+    // Expired since the last scheduled refresh: renew once and retry
+    const refreshed = await refreshAccessToken();
+    if (refreshed) res = await request(refreshed);
+  }
 
   if (!res.ok) {
     const error = await res.json();
@@ -27,6 +35,13 @@ const fetchWithAuth = async (endpoint: string) => {
   return res.json();
 };
 
+/**
+ * Get every analytics section in a single request
+ */
+export const getAnalyticsDashboard = async () => {
+  return await fetchWithAuth("/dashboard");
+};
+
 /**
  * Get shipment summary counts
  */
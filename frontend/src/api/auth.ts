@@ -1,5 +1,10 @@
 const BASE_URL = "http://localhost:8000";
 
+// Every page reads the access token from this one key
+const ACCESS_TOKEN_KEY = "access_token";
+// Renew this long before the access token's exp
+const REFRESH_BEFORE_EXPIRY_MS = 5 * 60 * 1000;
+
 /**
  * Logs in the user and stores access token in localStorage
  */
@@ -21,7 +26,8 @@ export const loginUser = async (email: string, password: string) => {
     const data = await res.json();
 
     // ✅ Save access token to localStorage
-    localStorage.setItem("token", data.access_token);
+    localStorage.setItem(ACCESS_TOKEN_KEY, data.access_token);
+    localStorage.setItem("refresh_token", data.refresh_token);
 
     return data;
   } catch (err) {
@@ -59,12 +65,77 @@ export const registerUser = async (email: string, password: string) => {
  * Get token from localStorage
  */
 export const getAccessToken = (): string | null => {
-  return localStorage.getItem("token");
+  return localStorage.getItem(ACCESS_TOKEN_KEY);
+};
+
+/**
+ * Milliseconds until the stored access token expires, or null if there is
+ * no readable token
+ */
+export const accessTokenExpiresIn = (): number | null => {
+  const token = getAccessToken();
+  if (!token) return null;
+  try {
+    const payload = token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/");
+    const { exp } = JSON.parse(atob(payload));
+    return typeof exp === "number" ? exp * 1000 - Date.now() : null;
+  } catch {
+    return null;
+  }
 };
 
 /**
- * Clear token on logout
+ * Swap the stored refresh token for a fresh access token (no password needed)
  */
-export const logoutUser = () => {
+export const refreshAccessToken = async (): Promise<string | null> => {
+  const refreshToken = localStorage.getItem("refresh_token");
+  if (!refreshToken) return null;
+
+  const res = await fetch(`${BASE_URL}/auth/refresh`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ refresh_token: refreshToken }),
+  });
+
+  if (!res.ok) {
+    localStorage.removeItem("refresh_token");
+    return null;
+  }
+
+  const data = await res.json();
+  localStorage.setItem(ACCESS_TOKEN_KEY, data.access_token);
+  localStorage.setItem("refresh_token", data.refresh_token);
+  return data.access_token;
+};
+
+/**
+ * Refresh the access token if it is missing, expired or about to expire
+ */
+export const refreshIfExpiring = async (): Promise<void> => {
+  const expiresIn = accessTokenExpiresIn();
+  if (expiresIn !== null && expiresIn > REFRESH_BEFORE_EXPIRY_MS) return;
+  await refreshAccessToken();
+};
+
+/**
+ * Clear tokens on logout and revoke the refresh token server-side
+ */
+export const logoutUser = async () => {
+  const refreshToken = localStorage.getItem("refresh_token");
+  // "token" was used by older builds
   localStorage.removeItem("token");
+  localStorage.removeItem(ACCESS_TOKEN_KEY);
+  localStorage.removeItem("refresh_token");
+
+  if (refreshToken) {
+    await fetch(`${BASE_URL}/auth/logout`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    }).catch(() => undefined);
+  }
 };
@@ -34,11 +34,24 @@ const formatApiError = (error: any): string => {
   return "Something went wrong";
 };
 
+export type ShipmentPage = {
+  items: any[];
+  next_cursor: string | null;
+};
+
 /**
- * Fetch all shipments
+ * Fetch one page of a cursor-paginated shipment endpoint; pass the
+ * previous page's next_cursor to get the one after it
  */
-export const getAllShipments = async (token: string) => {
-  const res = await fetch(`${BASE_URL}/shipments/list-shipments`, {
+const fetchPage = async (
+  url: string,
+  token: string,
+  cursor?: string | null,
+): Promise<ShipmentPage> => {
+  const pageUrl = new URL(url);
+  if (cursor) pageUrl.searchParams.set("cursor", cursor);
+
+  const res = await fetch(pageUrl.toString(), {
     headers: {
       Authorization: `Bearer ${token}`,
     },
@@ -53,6 +66,19 @@ export const getAllShipments = async (token: string) => {
   return json;
 };
 
+/**
+ * Fetch one page of the user's shipments
+ */
+export const getShipmentsPage = async (
+  token: string,
+  options: { limit?: number; cursor?: string | null } = {},
+) => {
+  const url = new URL(`${BASE_URL}/shipments/list-shipments`);
+  if (options.limit) url.searchParams.set("limit", String(options.limit));
+
+  return fetchPage(url.toString(), token, options.cursor);
+};
+
 /**
  * Fetch a shipment by its ID
  */
@@ -216,6 +242,7 @@ export const searchShipments = async (
     date_from?: string;
     date_to?: string;
   },
+  cursor?: string | null,
 ) => {
   const params = new URLSearchParams();
 
@@ -223,17 +250,75 @@ export const searchShipments = async (
     if (value) params.append(key, value);
   });
 
-  const res = await fetch(`${BASE_URL}/shipments/search?${params.toString()}`, {
-    headers: {
-      Authorization: `Bearer ${token}`,
-    },
-  });
+  return fetchPage(
+    `${BASE_URL}/shipments/search?${params.toString()}`,
+    token,
+    cursor,
+  );
+};
 
-  const json = await res.json();
+export type ShipmentEvent =
+  | { type: "reset" }
+  | { type: "created" | "updated" | "deleted"; shipments: any[] };
 
-  if (!res.ok) {
-    throw new Error(formatApiError(json));
-  }
+/**
+ * Follow the server-sent stream of the user's shipment changes.
+ * Uses fetch rather than EventSource so the token stays in a header.
+ * Reconnects until the returned function is called; every (re)connect
+ * starts with a "reset" event, after which the caller should refetch.
+ */
+export const subscribeToShipmentEvents = (
+  getToken: () => string | null,
+  onEvent: (event: ShipmentEvent) => void,
+) => {
+  const controller = new AbortController();
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const token = getToken();
+        if (!token) throw new Error("Access token not found");
+
+        const res = await fetch(`${BASE_URL}/shipments/events`, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+          signal: controller.signal,
+        });
+
+        if (!res.ok || !res.body) {
+          throw new Error(formatApiError(await res.json().catch(() => null)));
+        }
 
-  return json;
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = "";
+
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+
+          buffer += value;
+          const messages = buffer.split("\n\n");
+          buffer = messages.pop() ?? "";
+
+          for (const message of messages) {
+            const data = message
+              .split("\n")
+              .filter((line) => line.startsWith("data:"))
+              .map((line) => line.slice(5).trim())
+              .join("\n");
+            if (data) onEvent(JSON.parse(data));
+          }
+        }
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.error(err);
+      }
+
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
 };
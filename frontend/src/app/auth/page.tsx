@@ -42,8 +42,7 @@ export default function AuthPage() {
     try {
       setLoading(true);
       if (tab === "login") {
-        const res = await loginUser(email, password);
-        localStorage.setItem("access_token", res.access_token);
+        await loginUser(email, password);
         router.push("/dashboard");
         setSuccess("Login successful 🎉");
       } else {
@@ -1,13 +1,7 @@
 "use client";
 
 import { useEffect, useMemo, useState } from "react";
-import {
-  getShipmentSummary,
-  getAverageDeliveryTime,
-  getProviderWiseCount,
-  getStatusTrend,
-  getTopRoutes,
-} from "@/api/analytics";
+import { getAnalyticsDashboard } from "@/api/analytics";
 
 import { Card, CardContent } from "@/components/ui/card";
 import {
@@ -63,14 +57,12 @@ export default function AnalyticsPage() {
   useEffect(() => {
     const fetchAnalytics = async () => {
       try {
-        const [summaryRes, avgRes, providerRes, statusRes, routesRes] =
-          await Promise.all([
-            getShipmentSummary(),
-            getAverageDeliveryTime(),
-            getProviderWiseCount(),
-            getStatusTrend(),
-            getTopRoutes(),
-          ]);
+        const dashboard = await getAnalyticsDashboard();
+        const summaryRes = dashboard?.summary;
+        const avgRes = dashboard?.average_delivery_time;
+        const providerRes = dashboard?.provider_count;
+        const statusRes = dashboard?.status_trend;
+        const routesRes = dashboard?.top_routes;
 
         setSummary(summaryRes || {});
         setAvgDeliveryTime(getAvgDays(avgRes));
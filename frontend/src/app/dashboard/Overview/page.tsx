@@ -16,8 +16,10 @@ import {
 } from "lucide-react";
 import {
   getAnalyticsSummary,
-  getAllShipments,
+  getShipmentsPage,
+  subscribeToShipmentEvents,
   updateShipmentStatus,
+  type ShipmentEvent,
 } from "@/api/shipments";
 
 type Summary = {
@@ -67,6 +69,58 @@ const formatDate = (date?: string) => {
   });
 };
 
+const RECENT_SHIPMENTS = 10;
+
+/**
+ * Apply a pushed delta to the summary counters
+ */
+const applyToSummary = (summary: Summary | null, event: ShipmentEvent) => {
+  if (!summary || event.type === "reset") return summary;
+
+  const next: Record<string, number> = { ...summary };
+  const bump = (status: string | undefined, by: number) => {
+    if (status && status in next) next[status] += by;
+  };
+
+  for (const shipment of event.shipments) {
+    if (event.type === "created") {
+      next.total += 1;
+      bump(shipment.status, 1);
+    } else if (event.type === "deleted") {
+      next.total -= 1;
+      bump(shipment.status, -1);
+    } else if (shipment.old_status && shipment.old_status !== shipment.status) {
+      bump(shipment.old_status, -1);
+      bump(shipment.status, 1);
+    }
+  }
+
+  return next as Summary;
+};
+
+/**
+ * Apply a pushed delta to the recent shipments table
+ */
+const applyToShipments = (shipments: Shipment[], event: ShipmentEvent) => {
+  if (event.type === "created") {
+    return [...shipments, ...event.shipments].slice(0, RECENT_SHIPMENTS);
+  }
+  if (event.type === "updated") {
+    const changes = new Map(event.shipments.map((s) => [s.id, s]));
+    return shipments.map((shipment) => {
+      const change = changes.get(shipment.id);
+      if (!change) return shipment;
+      const { old_status, ...fields } = change;
+      return { ...shipment, ...fields };
+    });
+  }
+  if (event.type === "deleted") {
+    const deleted = new Set(event.shipments.map((s) => s.id));
+    return shipments.filter((shipment) => !deleted.has(shipment.id));
+  }
+  return shipments;
+};
+
 const formatInputDate = (date?: string) => {
   if (!date) return "";
   return new Date(date).toISOString().split("T")[0];
@@ -97,11 +151,11 @@ export default function OverviewPage() {
 
       const [summaryData, shipmentData] = await Promise.all([
         getAnalyticsSummary(token),
-        getAllShipments(token),
+        getShipmentsPage(token, { limit: RECENT_SHIPMENTS }),
       ]);
 
       setSummary(summaryData);
-      setShipments(shipmentData.slice(0, 10));
+      setShipments(shipmentData.items);
     } catch (err) {
       console.error(err);
       setError("Failed to load dashboard data.");
@@ -110,8 +164,25 @@ export default function OverviewPage() {
     }
   };
 
+  // Live updates: every (re)connect starts with a "reset", which triggers
+  // the summary and first-page fetch; after that only small deltas arrive
   useEffect(() => {
-    fetchDashboardData();
+    if (!localStorage.getItem("access_token")) {
+      fetchDashboardData();
+      return;
+    }
+
+    return subscribeToShipmentEvents(
+      () => localStorage.getItem("access_token"),
+      (event) => {
+        if (event.type === "reset") {
+          fetchDashboardData();
+          return;
+        }
+        setSummary((summary) => applyToSummary(summary, event));
+        setShipments((shipments) => applyToShipments(shipments, event));
+      },
+    );
   }, []);
 
   const filteredShipments = useMemo(() => {
@@ -21,7 +21,9 @@ import {
 import {
   deleteShipment,
   exportShipmentsCsv,
-  getAllShipments,
+  getAnalyticsSummary,
+  getShipmentsPage,
+  searchShipments,
   updateShipmentStatus,
 } from "@/api/shipments";
 
@@ -43,6 +45,13 @@ type Shipment = {
   created_at?: string;
 };
 
+type Summary = {
+  total: number;
+  delivered: number;
+  pending: number;
+  in_transit: number;
+};
+
 type Provider = {
   id: string;
   name?: string;
@@ -53,8 +62,11 @@ const statusOptions = ["pending", "in_transit", "delivered", "cancelled"];
 
 export default function AllShipmentsPage() {
   const [shipments, setShipments] = useState<Shipment[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [summary, setSummary] = useState<Summary | null>(null);
   const [providers, setProviders] = useState<Provider[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [actionLoading, setActionLoading] = useState(false);
   const [error, setError] = useState("");
 
@@ -64,6 +76,13 @@ export default function AllShipmentsPage() {
   const [viewShipment, setViewShipment] = useState<Shipment | null>(null);
   const [editShipment, setEditShipment] = useState<Shipment | null>(null);
 
+  // The status filter is applied by the server, so paging stays correct;
+  // the free-text box only filters the pages loaded so far
+  const fetchPage = (token: string, cursor?: string | null) =>
+    statusFilter === "all"
+      ? getShipmentsPage(token, { cursor })
+      : searchShipments(token, { status: statusFilter }, cursor);
+
   const fetchData = async () => {
     try {
       setLoading(true);
@@ -76,16 +95,15 @@ export default function AllShipmentsPage() {
         return;
       }
 
-      const [shipmentData, providerData] = await Promise.all([
-        getAllShipments(token),
+      const [shipmentPage, summaryData, providerData] = await Promise.all([
+        fetchPage(token),
+        getAnalyticsSummary(token),
         getAllShippingProviders(token),
       ]);
 
-      const shipmentList = Array.isArray(shipmentData)
-        ? shipmentData
-        : shipmentData?.data || [];
-
-      setShipments(shipmentList);
+      setShipments(shipmentPage.items);
+      setNextCursor(shipmentPage.next_cursor);
+      setSummary(summaryData);
 
       if (providerData.status === "success") {
         setProviders(providerData.data || []);
@@ -97,9 +115,25 @@ export default function AllShipmentsPage() {
     }
   };
 
+  const loadMore = async () => {
+    const token = localStorage.getItem("access_token");
+    if (!token || !nextCursor) return;
+
+    try {
+      setLoadingMore(true);
+      const shipmentPage = await fetchPage(token, nextCursor);
+      setShipments((loaded) => [...loaded, ...shipmentPage.items]);
+      setNextCursor(shipmentPage.next_cursor);
+    } catch (err: any) {
+      setError(err?.message || "Failed to fetch shipments");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchData();
-  }, []);
+  }, [statusFilter]);
 
   const getProviderDisplayName = (providerId?: string) => {
     if (!providerId) return "N/A";
@@ -125,22 +159,9 @@ export default function AllShipmentsPage() {
         shipment.status?.toLowerCase().includes(query) ||
         providerName.toLowerCase().includes(query);
 
-      const normalizedStatus = shipment.status?.toLowerCase().replace(" ", "_");
-      const matchesStatus =
-        statusFilter === "all" || normalizedStatus === statusFilter;
-
-      return matchesSearch && matchesStatus;
+      return matchesSearch;
     });
-  }, [shipments, providers, search, statusFilter]);
-
-  const summary = {
-    total: shipments.length,
-    pending: shipments.filter((s) => s.status === "pending").length,
-    delivered: shipments.filter((s) => s.status === "delivered").length,
-    transit: shipments.filter(
-      (s) => s.status === "in_transit" || s.status === "in transit",
-    ).length,
-  };
+  }, [shipments, providers, search]);
 
   const handleDelete = async (shipment: Shipment) => {
     const token = localStorage.getItem("access_token");
@@ -221,7 +242,7 @@ export default function AllShipmentsPage() {
         <section className="mb-6 grid grid-cols-1 gap-4 sm:grid-cols-2 xl:grid-cols-4">
           <SummaryCard
             title="Total Shipments"
-            value={summary.total}
+            value={summary?.total ?? 0}
             text="All shipment records"
             icon={<PackageSearch size={22} />}
             variant="slate"
@@ -229,7 +250,7 @@ export default function AllShipmentsPage() {
 
           <SummaryCard
             title="In Transit"
-            value={summary.transit}
+            value={summary?.in_transit ?? 0}
             text="Currently moving"
             icon={<Truck size={22} />}
             variant="blue"
@@ -237,7 +258,7 @@ export default function AllShipmentsPage() {
 
           <SummaryCard
             title="Delivered"
-            value={summary.delivered}
+            value={summary?.delivered ?? 0}
             text="Successfully completed"
             icon={<CheckCircle2 size={22} />}
             variant="green"
@@ -245,7 +266,7 @@ export default function AllShipmentsPage() {
 
           <SummaryCard
             title="Pending"
-            value={summary.pending}
+            value={summary?.pending ?? 0}
             text="Awaiting processing"
             icon={<CalendarDays size={22} />}
             variant="amber"
@@ -466,6 +487,19 @@ export default function AllShipmentsPage() {
               </div>
             </>
           )}
+
+          {!loading && !error && nextCursor && (
+            <div className="flex justify-center border-t border-slate-100 p-4">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="inline-flex h-11 items-center justify-center gap-2 rounded-2xl border border-slate-200 bg-white px-5 text-sm font-bold text-slate-700 transition hover:bg-slate-50 disabled:cursor-not-allowed disabled:opacity-60"
+              >
+                {loadingMore && <Loader2 className="animate-spin" size={16} />}
+                Load more
+              </button>
+            </div>
+          )}
         </section>
       </div>
 
@@ -1,8 +1,9 @@
 // app/dashboard/layout.tsx
 "use client";
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import Sidebar from "@/components/layout/Sidebar"; // Ensure this path is correct
+import { refreshIfExpiring } from "@/api/auth";
 import { Inter } from "next/font/google";
 
 const inter = Inter({ subsets: ["latin"] });
@@ -14,6 +15,17 @@ export default function DashboardLayout({
 }) {
   const [collapsed, setCollapsed] = useState(false);
 
+  // Renew the access token before it expires instead of asking for the
+  // password again; checked on mount too, since a reload keeps the old token
+  useEffect(() => {
+    const check = () => {
+      refreshIfExpiring().catch(() => undefined);
+    };
+    check();
+    const interval = setInterval(check, 60 * 1000);
+    return () => clearInterval(interval);
+  }, []);
+
   return (
     <div
       className={`${inter.className} flex min-h-screen bg-[#f9fafb] text-gray-900`}
@@ -12,6 +12,7 @@ import {
 } from "lucide-react";
 import { useRouter } from "next/navigation";
 import type { ReactNode } from "react";
+import { logoutUser } from "@/api/auth";
 
 interface SidebarProps {
   collapsed: boolean;
@@ -83,8 +84,8 @@ export default function Sidebar({ collapsed, setCollapsed }: SidebarProps) {
           icon={<LogOut size={18} />}
           label="Logout"
           collapsed={collapsed}
-          onClick={() => {
-            localStorage.removeItem("access_token");
+          onClick={async () => {
+            await logoutUser();
             router.push("/auth");
           }}
         />